@@ -27,83 +27,79 @@ required_apps = ["frappe/erpnext"]
 
 # Fixtures
 # --------
+# Filter values are frozen once at import; underscore-prefixed so Frappe
+# does not pick them up as hooks.
+# Sorted once so every process emits identical IN (...) SQL text
+_CUSTOM_FIELD_DOCTYPES = tuple(sorted({
+    "Item",
+    "Sales Invoice",
+    "Sales Invoice Item",
+    "Purchase Invoice",
+    "Purchase Invoice Item",
+    "Customer",
+    "Customer Group",
+    "Stock Ledger Entry",
+    "BOM",
+    "Warehouse",
+    "Item Tax Template",
+    "Branch",
+    "Supplier",
+}))
+_TAXATION_TYPE_NAMES = ("A", "B", "C", "D", "E")
+_PRODUCT_TYPE_NAMES = (1, 2, 3)
+_PAYMENT_TYPE_NAMES = (
+    "CASH",
+    "CREDIT",
+    "CASH/CREDIT",
+    "BANK CHECK",
+    "DEBIT&CREDIT CARD",
+    "MOBILE MONEY",
+    "OTHER",
+)
+_TRANSACTION_PROGRESS_NAMES = (
+    "Wait for Approval",
+    "Approved",
+    "Cancel Requested",
+    "Canceled",
+    "Credit Note Generated",
+    "Transferred",
+)
+_UNFILTERED_FIXTURE_DOCTYPES = (
+    TRANSACTION_TYPE_DOCTYPE_NAME,
+    PURCHASE_RECEIPT_DOCTYPE_NAME,
+    UNIT_OF_QUANTITY_DOCTYPE_NAME,
+    IMPORTED_ITEMS_STATUS_DOCTYPE_NAME,
+    ROUTES_URL_FUNCTION_DOCTYPE_NAME,
+    COUNTRIES_DOCTYPE_NAME,
+    ITEM_CLASSIFICATIONS_DOCTYPE_NAME,
+)
+
 fixtures = [
     {
         "doctype": "Custom Field",
         "filters": [
-            [
-                "dt",
-                "in",
-                (
-                    "Item",
-                    "Sales Invoice",
-                    "Sales Invoice Item",
-                    "Purchase Invoice",
-                    "Purchase Invoice Item",
-                    "Customer",
-                    "Customer Group",
-                    "Stock Ledger Entry",
-                    "BOM",
-                    "Warehouse",
-                    "Item Tax Template",
-                    "Branch",
-                    "Supplier",
-                ),
-            ],
+            ["dt", "in", _CUSTOM_FIELD_DOCTYPES],
             ["is_system_generated", "=", 0],
         ],
     },
-    {"dt": TRANSACTION_TYPE_DOCTYPE_NAME},
-    {"dt": PURCHASE_RECEIPT_DOCTYPE_NAME},
-    {"dt": UNIT_OF_QUANTITY_DOCTYPE_NAME},
-    {"dt": IMPORTED_ITEMS_STATUS_DOCTYPE_NAME},
-    {"dt": ROUTES_URL_FUNCTION_DOCTYPE_NAME},
-    {"dt": COUNTRIES_DOCTYPE_NAME},
-    {"dt": ITEM_CLASSIFICATIONS_DOCTYPE_NAME},
+    *[{"dt": doctype} for doctype in _UNFILTERED_FIXTURE_DOCTYPES],
     {
         "dt": TAXATION_TYPE_DOCTYPE_NAME,
-        "filters": [["name", "in", ("A", "B", "C", "D", "E")]],
+        "filters": [["name", "in", _TAXATION_TYPE_NAMES]],
     },
     {
         "dt": PRODUCT_TYPE_DOCTYPE_NAME,
-        "filters": [["name", "in", (1, 2, 3)]],
+        "filters": [["name", "in", _PRODUCT_TYPE_NAMES]],
     },
     {"dt": PACKAGING_UNIT_DOCTYPE_NAME},
     {"dt": STOCK_MOVEMENT_TYPE_DOCTYPE_NAME},
     {
         "dt": PAYMENT_TYPE_DOCTYPE_NAME,
-        "filters": [
-            [
-                "name",
-                "in",
-                (
-                    "CASH",
-                    "CREDIT",
-                    "CASH/CREDIT",
-                    "BANK CHECK",
-                    "DEBIT&CREDIT CARD",
-                    "MOBILE MONEY",
-                    "OTHER",
-                ),
-            ]
-        ],
+        "filters": [["name", "in", _PAYMENT_TYPE_NAMES]],
     },
     {
         "dt": TRANSACTION_PROGRESS_DOCTYPE_NAME,
-        "filters": [
-            [
-                "name",
-                "in",
-                (
-                    "Wait for Approval",
-                    "Approved",
-                    "Cancel Requested",
-                    "Canceled",
-                    "Credit Note Generated",
-                    "Transferred",
-                ),
-            ]
-        ],
+        "filters": [["name", "in", _TRANSACTION_PROGRESS_NAMES]],
     },
     {
         "doctype": "Workspace",
@@ -188,6 +184,10 @@ doctype_list_js = {
 # before_install = "kra_etims.install.before_install"
 # after_install = "kra_etims.kra_etims.setup.after_install.after_install"
 
+# Indexes on the fixture custom fields; patches don't run on a fresh install
+after_install = "kra_etims_frappe.kra_etims.setup.indexes.add_submission_indexes"
+after_migrate = "kra_etims_frappe.kra_etims.setup.indexes.add_submission_indexes"
+
 # Uninstallation
 # ------------
 
@@ -249,39 +249,20 @@ doc_events = {
     # 		"on_trash": "method"
     # 	}
     "Sales Invoice": {
-        "before_save":[
-            "kra_etims_frappe.kra_etims.utils.before_save_"
-        ],
-        "on_submit": [
-            "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.on_submit"
-        ],
-        "validate": [
-            "kra_etims_frappe.kra_etims.overrides.server.shared_overrides.validate"
-        ],
-        "before_cancel":[
-            "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.before_cancel"
-        ],
+        "before_save": "kra_etims_frappe.kra_etims.utils.before_save_",
+        "on_submit": "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.on_submit",
+        "validate": "kra_etims_frappe.kra_etims.overrides.server.shared_overrides.validate",
+        "before_cancel": "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.before_cancel",
     },
     "Purchase Invoice": {
-        "before_save":[
-            "kra_etims_frappe.kra_etims.utils.before_save_"
-        ],
-        "on_submit": [
-            "kra_etims_frappe.kra_etims.overrides.server.purchase_invoice.on_submit"
-        ],
-        "validate": [
-            "kra_etims_frappe.kra_etims.overrides.server.purchase_invoice.validate"
-        ],
-        "before_cancel":[
-            "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.before_cancel"
-        ],
+        "before_save": "kra_etims_frappe.kra_etims.utils.before_save_",
+        "on_submit": "kra_etims_frappe.kra_etims.overrides.server.purchase_invoice.on_submit",
+        "validate": "kra_etims_frappe.kra_etims.overrides.server.purchase_invoice.validate",
+        "before_cancel": "kra_etims_frappe.kra_etims.overrides.server.sales_invoice.before_cancel",
     },
     "Item": {
-        "validate": [
-            "kra_etims_frappe.kra_etims.overrides.server.item.validate"
-            
-        ],
-        "on_trash": "kra_etims_frappe.kra_etims.overrides.server.item.prevent_item_deletion"
+        "validate": "kra_etims_frappe.kra_etims.overrides.server.item.validate",
+        "on_trash": "kra_etims_frappe.kra_etims.overrides.server.item.prevent_item_deletion",
     },
 }
 
@@ -289,10 +270,16 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
-    "all": [
-        "kra_etims_frappe.kra_etims.background_tasks.tasks.send_stock_information",
-        "kra_etims_frappe.kra_etims.background_tasks.tasks.send_item_inventory_information",
-    ],
+    # 	"all": [
+    # 		"kra_etims.tasks.all"
+    # 	],
+    "cron": {
+        # Every two hours; overridable per site through eTims Settings
+        "0 */2 * * *": [
+            "kra_etims_frappe.kra_etims.background_tasks.tasks.send_stock_information",
+            "kra_etims_frappe.kra_etims.background_tasks.tasks.send_item_inventory_information",
+        ],
+    },
     # 	"daily": [
     # 		"kra_etims.tasks.daily"
     # 	],
@@ -1,17 +1,32 @@
 """eTIMS Integration module using kra_etims SDK"""
 import json
+import threading
+import time
 import frappe
+import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from functools import partial
-from secrets import token_hex
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator
 from frappe.model.document import Document
-from frappe.integrations.utils import create_request_log
-from frappe.utils import random_string
+from frappe.utils import create_batch, now_datetime, random_string
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from kra_etims_sdk.auth import AuthClient
 from kra_etims_sdk.client import EtimsClient
 
+try:
+    # Optional: much faster (de)serialisation on the logging path when present
+    import orjson
+except ImportError:
+    orjson = None
+
 # Local imports
 from ..doctype.doctype_names_mapping import (
     COUNTRIES_DOCTYPE_NAME,
@@ -19,10 +34,10 @@ from ..doctype.doctype_names_mapping import (
     USER_DOCTYPE_NAME,
 )
 from ..utils import (
-    build_datetime_from_string,
     split_user_email,
     get_curr_env_etims_settings,
     get_first_branch_id,
+    get_docs_in_bulk,
 )
 from .remote_response_status_handlers import (
     customer_branch_details_submission_on_success,
@@ -54,53 +69,366 @@ class EtimsSDKWrapper:
         if not branch_id:
             frappe.throw("Branch ID could not be determined")
 
-        cache_key = f"etims_client:{company_name}:{vendor}:{branch_id}"
-        cached_client = frappe.cache().get_value(cache_key)
-        
-        if cached_client:
-            return cached_client
-        
-        settings = get_curr_env_etims_settings(company_name, vendor, branch_id)
+        # The generation token changes whenever settings are saved, so workers
+        # drop their memoised clients without needing a signal of their own
+        return _cached_client(
+            frappe.local.site, company_name, vendor, branch_id, get_client_cache_generation()
+        )
+
+    @classmethod
+    def clear_client_cache(cls) -> None:
+        """Discard memoised clients in this process and, via the generation token, in every worker"""
+        with _client_cache_lock:
+            _client_cache.clear()
+
+        frappe.cache().set_value(CLIENT_CACHE_GENERATION_KEY, random_string(10))
+        frappe.cache().delete_keys("etims_settings:")
+        frappe.cache().delete_keys("etims_token:")
+
+    @classmethod
+    def build_client(cls, company_name: str, vendor: str, branch_id: str) -> EtimsClient:
+        """Build an SDK client from the active settings.
+
+        Only the plain settings dict is shared through Redis; the client, with
+        its HTTP and token state, is always constructed in this process.
+        """
+        settings = get_cached_client_settings(company_name, vendor, branch_id)
         if not settings:
             frappe.throw(
                 f"No eTIMS settings found for company: {company_name}, branch: {branch_id}",
                 title="Configuration Error"
             )
-        
-        # Build SDK configuration from Frappe settings (FIXED: removed trailing spaces in URLs)
-        config = {
-            'env': 'sbx' if settings.env == "Sandbox" else 'prod',
+
+        config = EtimsConfig.from_settings(settings).as_sdk_config()
+        return PooledEtimsClient(config, SharedTokenAuthClient(config))
+
+
+class SharedTokenAuthClient(AuthClient):
+    """AuthClient whose bearer token is shared by every worker through Redis.
+
+    The token is also kept on the instance, so calls made once it is known
+    need no frappe context; Redis is only consulted on an instance miss or a
+    forced refresh, and only from a thread bound to a site. When the API
+    rejects a token the SDK calls forget_token(), which drops both copies.
+    """
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self._token: tuple[str, float] | None = None
+
+    def token(self, force: bool = False) -> str:
+        now = time.time()
+        if not force:
+            if self._token and self._token[1] > now:
+                return self._token[0]
+
+            if has_site_context():
+                shared = frappe.cache().get_value(self.shared_token_key())
+                if isinstance(shared, dict) and shared["expires_at"] > now:
+                    self._token = (shared["token"], shared["expires_at"])
+                    return shared["token"]
+
+        # Always fetch a fresh token here: the SDK's own cache may hand back one
+        # already part-way through its life, which the TTL below would outlast
+        token = super().token(force=True)
+        self._token = (token, now + TOKEN_CACHE_TTL)
+        if has_site_context():
+            frappe.cache().set_value(
+                self.shared_token_key(),
+                {"token": token, "expires_at": self._token[1]},
+                expires_in_sec=TOKEN_CACHE_TTL,
+            )
+        return token
+
+    def forget_token(self) -> None:
+        self._token = None
+        if has_site_context():
+            frappe.cache().delete_value(self.shared_token_key())
+        super().forget_token()
+
+    def shared_token_key(self) -> str:
+        oscu = self.config.get("oscu", {})
+        return f"etims_token:{oscu.get('tin')}:{oscu.get('bhf_id')}:{self.config.get('env')}"
+
+
+# KRA tokens live for an hour; keep the shared copy a little shorter
+TOKEN_CACHE_TTL = 3300
+
+
+def has_site_context() -> bool:
+    """Whether this thread is bound to a site; frappe.local isn't carried into pool threads"""
+    return bool(getattr(frappe.local, "site", None))
+
+
+class PooledEtimsClient(EtimsClient):
+    """EtimsClient that sends its calls over one keep-alive session.
+
+    The SDK issues each call through requests.request, opening a fresh TLS
+    connection every time. Clients are memoised per worker, so a session held
+    by the client keeps the connection to the eTIMS API open between jobs.
+    """
+
+    def __init__(self, config: dict, auth: AuthClient) -> None:
+        super().__init__(config, auth)
+        self.session = requests.Session()
+
+        # Room for the concurrent composition and inventory calls, and a retry when the
+        # connection itself fails. Read errors aren't retried and statuses
+        # only for idempotent methods, so a submission is never sent twice
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=COMPOSITION_SUBMISSION_WORKERS,
+            max_retries=Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=(502, 503, 504),
+            ),
+        )
+        self.session.mount("https://", adapter)
+
+    def _request(self, method: str, endpoint: str, data: dict) -> requests.Response:
+        url = self.base_url() + endpoint
+        headers = self._headers(endpoint)
+
+        if method.upper() == "GET" and data:
+            return self.session.get(url, params=data, headers=headers, timeout=self.timeout())
+
+        return self.session.request(method.upper(), url, json=data, headers=headers, timeout=self.timeout())
+
+
+ETIMS_ENDPOINTS = {
+    'sbx': ('https://sbx.kra.go.ke/v1/token/generate', 'https://etims-api-sbx.kra.go.ke/etims-api'),
+    'prod': ('https://kra.go.ke/v1/token/generate', 'https://etims-api.kra.go.ke/etims-api'),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class EtimsConfig:
+    """Flat, immutable view of the settings an SDK client is built from"""
+
+    env: str
+    token_url: str
+    consumer_key: str
+    consumer_secret: str
+    base_url: str
+    tin: str
+    bhf_id: str
+    device_serial: str
+    cmc_key: str
+    timeout: int = 30
+
+    @classmethod
+    def from_settings(cls, settings: frappe._dict) -> "EtimsConfig":
+        env = 'sbx' if settings.env == "Sandbox" else 'prod'
+        token_url, base_url = ETIMS_ENDPOINTS[env]
+
+        return cls(
+            env=env,
+            token_url=token_url,
+            consumer_key=settings.consumer_key,
+            consumer_secret=settings.consumer_secret,
+            base_url=base_url,
+            tin=settings.tin,
+            bhf_id=settings.bhfid,
+            device_serial=settings.dvcsrlno,
+            cmc_key=settings.communication_key or '',
+        )
+
+    def as_sdk_config(self) -> dict:
+        """The nested mapping AuthClient and EtimsClient expect, for the active env only"""
+        return {
+            'env': self.env,
             'auth': {
-                'sbx': {
-                    'token_url': 'https://sbx.kra.go.ke/v1/token/generate',
-                    'consumer_key': settings.consumer_key,
-                    'consumer_secret': settings.consumer_secret,
+                self.env: {
+                    'token_url': self.token_url,
+                    'consumer_key': self.consumer_key,
+                    'consumer_secret': self.consumer_secret,
                 },
-                'prod': {
-                    'token_url': 'https://kra.go.ke/v1/token/generate',
-                    'consumer_key': settings.consumer_key,
-                    'consumer_secret': settings.consumer_secret,
-                }
             },
-            'api': {
-                'sbx': {'base_url': 'https://etims-api-sbx.kra.go.ke/etims-api'},
-                'prod': {'base_url': 'https://etims-api.kra.go.ke/etims-api'}
-            },
-            'http': {'timeout': 30},
+            'api': {self.env: {'base_url': self.base_url}},
+            'http': {'timeout': self.timeout},
             'oscu': {
-                'tin': settings.tin,
-                'bhf_id': settings.bhfid,
-                'device_serial': settings.dvcsrlno,
-                'cmc_key': settings.communication_key or '',
+                'tin': self.tin,
+                'bhf_id': self.bhf_id,
+                'device_serial': self.device_serial,
+                'cmc_key': self.cmc_key,
             }
         }
-        
-        auth = AuthClient(config)
-        client = EtimsClient(config, auth)
-        
-        # Cache client for 55 minutes (just under token expiry)
-        frappe.cache().set_value(cache_key, client, expires_in_sec=3300)
-        return client
+
+
+CLIENT_CACHE_GENERATION_KEY = "etims_client_generation"
+
+
+def get_client_cache_generation() -> str:
+    return frappe.cache().get_value(CLIENT_CACHE_GENERATION_KEY) or ""
+
+
+# Process-local clients keyed by site, company, vendor, branch and generation
+CLIENT_CACHE_TTL = 300
+_client_cache: dict[tuple, tuple[EtimsClient, float]] = {}
+_client_cache_lock = threading.Lock()
+
+
+def _cached_client(site: str, company_name: str, vendor: str, branch_id: str, generation: str) -> EtimsClient:
+    """Per-process memo of SDK clients so a worker reuses one client across submissions"""
+    key = (site, company_name, vendor, branch_id, generation)
+    now = time.monotonic()
+
+    with _client_cache_lock:
+        cached = _client_cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    client = EtimsSDKWrapper.build_client(company_name, vendor, branch_id)
+
+    with _client_cache_lock:
+        # Entries of older generations are never hit again; drop them as they expire
+        for stale_key in [k for k, (_, expiry) in _client_cache.items() if expiry <= now]:
+            del _client_cache[stale_key]
+
+        _client_cache[key] = (client, now + CLIENT_CACHE_TTL)
+
+    return client
+
+
+def get_cached_client_settings(company_name: str, vendor: str, branch_id: str) -> frappe._dict | None:
+    """Resolve the active settings row through Redis, remembering misses as well as hits"""
+    cache_key = f"etims_settings:{company_name}:{vendor}:{branch_id}"
+    settings = frappe.cache().get_value(cache_key)
+
+    if settings is None:
+        try:
+            settings = get_curr_env_etims_settings(company_name, vendor, branch_id) or {}
+        except frappe.ValidationError:
+            # The lookup has already logged the misconfiguration; remember the
+            # miss so a burst of jobs doesn't repeat the query and the log
+            settings = {}
+
+        frappe.cache().set_value(cache_key, dict(settings), expires_in_sec=CLIENT_CACHE_TTL)
+
+    return frappe._dict(settings) if settings else None
+
+
+def load_request_data(request_data: str | dict) -> dict:
+    """Accept a JSON string from the client or a dict from server-side callers"""
+    if isinstance(request_data, str):
+        return orjson.loads(request_data) if orjson else json.loads(request_data)
+
+    return request_data
+
+
+def dump_response(response: dict) -> str:
+    """Serialise an eTIMS response compactly for the Integration Request log"""
+    if orjson:
+        return orjson.dumps(response, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    return json.dumps(response, separators=(",", ":"), default=str)
+
+
+def compact_etims_date(value: str) -> str:
+    """Turn a 'YYYY-MM-DD ...' date or timestamp into the YYYYMMDD form eTIMS expects"""
+    compact = value[:10].replace("-", "")
+    if len(compact) != 8 or not compact.isdigit():
+        frappe.throw(f"Invalid date: {value}", title="Validation Error")
+
+    return compact
+
+
+def last_request_date(days: int) -> str:
+    """The lastReqDt for a search covering the past number of days"""
+    return (datetime.now() - timedelta(days=days)).strftime("%Y%m%d%H%M%S")
+
+
+def dump_response_summary(response: dict) -> str:
+    """Log the result fields and the size of each returned list, not the records.
+
+    For searches whose records are stored by their success handler anyway, so
+    a year of import declarations isn't serialised a second time into the log.
+    """
+    data = response.get("data") or {}
+    summary = {key: response.get(key) for key in ("resultCd", "resultMsg", "resultDt")}
+    summary["data"] = {
+        key: f"{len(value)} records" if isinstance(value, list) else value
+        for key, value in data.items()
+    }
+
+    return dump_response(summary)
+
+
+def insert_integration_request(
+    data: dict,
+    url: str,
+    reference_doctype: str,
+    reference_docname: str,
+    service_name: str = "eTIMS",
+    commit: bool = True,
+    status: str = "Queued",
+    output: str | None = None,
+    error: str | None = None,
+) -> frappe._dict:
+    """Insert an Integration Request row directly, without create_request_log's document lifecycle"""
+    (name,) = insert_integration_requests(
+        [
+            {
+                "data": data,
+                "url": url,
+                "reference_doctype": reference_doctype,
+                "reference_docname": reference_docname,
+                "status": status,
+                "output": output,
+                "error": error,
+            }
+        ],
+        service_name=service_name,
+        commit=commit,
+    )
+
+    return frappe._dict(name=name)
+
+
+# Column order of the rows built by insert_integration_requests
+INTEGRATION_REQUEST_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "docstatus",
+    "integration_request_service", "is_remote_request", "status", "url",
+    "request_headers", "data", "output", "error",
+    "reference_doctype", "reference_docname",
+)
+
+
+def insert_integration_requests(
+    entries: list[dict],
+    service_name: str = "eTIMS",
+    commit: bool = True,
+) -> list[str]:
+    """Insert Integration Request rows in one statement and return their names.
+
+    Each entry is a dict with data, url, reference_doctype and reference_docname,
+    and optionally status (Queued by default), output and error.
+    """
+    now = now_datetime()
+    user = frappe.session.user
+    names = [frappe.generate_hash(length=10) for _ in entries]
+
+    frappe.db.bulk_insert(
+        "Integration Request",
+        fields=INTEGRATION_REQUEST_FIELDS,
+        values=[
+            (
+                name, now, now, user, user, 0,
+                service_name, 1, entry.get("status", "Queued"), entry["url"],
+                "{}", json.dumps(entry["data"], default=str),
+                entry.get("output"), entry.get("error"),
+                entry["reference_doctype"], entry["reference_docname"],
+            )
+            for name, entry in zip(names, entries)
+        ],
+    )
+    if commit:
+        frappe.db.commit()
+
+    return names
 
 
 def update_integration_request_status(
@@ -108,230 +436,364 @@ def update_integration_request_status(
     status: str,
     output: str | None = None,
     error: str | None = None,
+    commit: bool | None = None,
 ) -> None:
-    """Updates an Integration Request record status after eTIMS API call"""
-    frappe.db.set_value(
-        "Integration Request",
-        integration_request_name,
-        {
-            "status": status,
-            "output": output,
-            "error": error,
-        },
-        update_modified=True
-    )
-    frappe.db.commit()
+    """Updates an Integration Request record status after eTIMS API call.
+
+    By default only failures are committed straight away, since the error
+    handling that follows them throws and would otherwise roll the status
+    back; successes are committed with the rest of the request or job.
+    Bulk callers pass commit=False and commit once when the batch is done.
+    """
+    integration_request = frappe.qb.DocType("Integration Request")
+    (
+        frappe.qb.update(integration_request)
+        .set(integration_request.status, status)
+        .set(integration_request.output, output)
+        .set(integration_request.error, error)
+        .set(integration_request.modified, now_datetime())
+        .where(integration_request.name == integration_request_name)
+    ).run()
+
+    if commit is None:
+        commit = status == "Failed"
+
+    if commit:
+        frappe.db.commit()
+
+
+def run_sdk_call(
+    company_name: str,
+    vendor: str,
+    branch_id: str | None,
+    sdk_method: str,
+    build_payload: Callable[[], dict],
+    on_success: Callable[[dict], None],
+    success_message: str,
+    route: str,
+    log_data: dict,
+    reference_doctype: str | None = None,
+    reference_docname: str | None = None,
+    log_name: str | None = None,
+    success_indicator: str | None = None,
+    commit: bool | None = None,
+    integration_request_name: str | None = None,
+    serialise_output: Callable[[dict], str] = dump_response,
+) -> None:
+    """Run one eTIMS SDK call with the shared audit logging and error handling.
+
+    build_payload runs inside the guarded block, so a malformed request is
+    recorded and reported the same way as a failed call. The Integration
+    Request is written once, with its outcome, after the SDK call returns,
+    rather than inserted before it and updated after. serialise_output turns
+    a successful response into the logged output.
+    """
+    url = None
+    integration_request = None
+
+    def record(status: str, output: str | None = None, error: str | None = None) -> frappe._dict:
+        # Bulk callers log their rows up front; only their status is left to set
+        if integration_request_name:
+            update_integration_request_status(
+                integration_request_name, status=status, output=output, error=error, commit=commit
+            )
+            return frappe._dict(name=integration_request_name)
+
+        return insert_integration_request(
+            data=log_data,
+            url=url,
+            reference_doctype=reference_doctype,
+            reference_docname=reference_docname,
+            commit=commit is not False,
+            status=status,
+            output=output,
+            error=error,
+        )
+
+    try:
+        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
+        url = f"SDK:{client.config['env']}:{log_name or sdk_method}"
+
+        response = getattr(client, sdk_method)(build_payload())
+
+        if response.get("resultCd") == "000":
+            integration_request = record("Completed", output=serialise_output(response))
+            on_success(response)
+            frappe.msgprint(success_message, indicator=success_indicator)
+        else:
+            integration_request = record("Failed", error=response.get("resultMsg", "Unknown error"))
+            frappe.msgprint(response.get("resultMsg", "Unknown error"))
+    except Exception as e:
+        if integration_request is not None:
+            update_integration_request_status(
+                integration_request.name,
+                status="Failed",
+                output=None,
+                error=str(e),
+                commit=commit,
+            )
+        elif url or integration_request_name:
+            record("Failed", error=str(e))
+
+        on_error(str(e), url=route, doctype=reference_doctype, document_name=reference_docname)
+
+
+SEARCH_LOCK_KEY = "etims:search_lock:{search}:{company}:{branch}"
+
+# Longer than any search should take; a crashed worker can't hold the lock past it
+SEARCH_LOCK_TTL = 300
+
+
+@contextmanager
+def single_search(search: str, company_name: str, branch_id: str | None) -> Iterator[bool]:
+    """Claim a search for a company branch; yields False if one is already running"""
+    cache = frappe.cache()
+    key = SEARCH_LOCK_KEY.format(search=search, company=company_name, branch=branch_id or "")
+    acquired = cache.set(cache.make_key(key), 1, ex=SEARCH_LOCK_TTL, nx=True)
+
+    try:
+        yield bool(acquired)
+    finally:
+        if acquired:
+            cache.delete_value(key)
+
+
+# Upper bound on the names sent in one IN (...) filter by the bulk handlers
+BULK_QUERY_BATCH_SIZE = 1000
 
 
 @frappe.whitelist()
 def bulk_submit_sales_invoices(docs_list: str) -> None:
     from ..overrides.server.sales_invoice import on_submit
     data = json.loads(docs_list)
-    
-    # Optimize: fetch only relevant invoices in one query
-    valid_names = {inv.name for inv in frappe.db.get_all(
-        "Sales Invoice", 
-        {"docstatus": 1, "custom_successfully_submitted": 0, "name": ["in", data]}, 
-        ["name"]
-    )}
-    
-    for record in data:
-        if record in valid_names:
-            doc = frappe.get_doc("Sales Invoice", record)
+
+    # Load the pending invoices and their child tables in a handful of queries
+    # per batch; the query already narrows the selection to the invoices still
+    # to send, and batching keeps each IN list to a sane size
+    for names in create_batch(data, BULK_QUERY_BATCH_SIZE):
+        for doc in get_docs_in_bulk(
+            "Sales Invoice",
+            {"docstatus": 1, "custom_successfully_submitted": 0, "name": ["in", names]},
+        ):
             on_submit(doc, method=None)
 
 
 @frappe.whitelist()
 def bulk_register_item(docs_list: str) -> None:
     data = json.loads(docs_list)
-    
-    # Optimize: fetch only relevant items in one query
-    valid_names = {item.name for item in frappe.db.get_all(
-        "Item", 
-        {"custom_item_registered": 0, "name": ["in", data]}, 
-        ["name"]
-    )}
-    
-    for record in data:
-        if record in valid_names:
-            process_single_item(record)
+
+    # The whole selection is registered by one worker, which builds the SDK
+    # client and fetches its token once for every item
+    frappe.enqueue(
+        bulk_register_items_job,
+        queue="default",
+        timeout=1800,
+        job_name="bulk_register_items",
+        names=data,
+        company_name=frappe.defaults.get_user_default("Company"),
+    )
+
+
+def bulk_register_items_job(names: list[str], company_name: str, vendor: str = "OSCU KRA") -> None:
+    """Register the given items in eTIMS, sharing one client and one commit"""
+    # Fetch every field the registration payload needs in one query per batch
+    items = [
+        item
+        for batch in create_batch(names, BULK_QUERY_BATCH_SIZE)
+        for item in frappe.db.get_all(
+            "Item",
+            {"custom_item_registered": 0, "name": ["in", batch]},
+            ITEM_REGISTRATION_FIELDS,
+        )
+    ]
+
+    if not items:
+        return
+
+    requests_data = [build_item_registration_data(item, company_name) for item in items]
+
+    # Log every request up front in one insert rather than one per item
+    env = EtimsSDKWrapper.get_client(company_name, vendor).config["env"]
+    integration_requests = insert_integration_requests(
+        [
+            {
+                "data": {key: value for key, value in request_data.items() if key != "company_name"},
+                "url": f"SDK:{env}:save_item",
+                "reference_doctype": "Item",
+                "reference_docname": request_data["name"],
+            }
+            for request_data in requests_data
+        ],
+        commit=False,
+    )
+
+    # A failing item must not abort the rest, or their rows would be
+    # committed as Queued without ever being attempted. Commit once for the
+    # whole batch, even if something unexpected escapes, so the items
+    # registered before it keep their flags and audit rows
+    try:
+        for request_data, integration_request in zip(requests_data, integration_requests):
+            try:
+                register_item(request_data, vendor, commit=False, integration_request_name=integration_request)
+
+            except frappe.InvalidStatusError:
+                # Marked Failed and logged against the item by run_sdk_call
+                continue
+    finally:
+        frappe.db.commit()
 
 
 @frappe.whitelist()
-def process_single_item(record: str) -> None:
+def process_single_item(record: str, company_name: str | None = None) -> None:
     """Process a single item for registration using SDK"""
-    item = frappe.get_doc("Item", record)
+    item = frappe.db.get_value("Item", record, ITEM_REGISTRATION_FIELDS, as_dict=True)
+    if not item:
+        frappe.throw(f"Item {record} not found", frappe.DoesNotExistError)
+
+    company_name = company_name or frappe.defaults.get_user_default("Company")
+    register_item(build_item_registration_data(item, company_name))
+
+
+ITEM_REGISTRATION_FIELDS = [
+    "name",
+    "item_name",
+    "valuation_rate",
+    "owner",
+    "modified_by",
+    "custom_item_code_etims",
+    "custom_item_classification",
+    "custom_product_type",
+    "custom_etims_country_of_origin_code",
+    "custom_packaging_unit_code",
+    "custom_unit_of_quantity_code",
+    "custom_taxation_type",
+]
+
+
+# Fixed fields of every item registration request
+ITEM_REGISTRATION_TEMPLATE = MappingProxyType({
+    "temStdNm": None,
+    "btchNo": None,
+    "bcd": None,
+    "grpPrcL1": None,
+    "grpPrcL2": None,
+    "grpPrcL3": None,
+    "grpPrcL4": None,
+    "grpPrcL5": None,
+    "addInfo": None,
+    "sftyQty": None,
+    "isrcAplcbYn": "Y",
+    "useYn": "Y",
+})
+
+
+def build_item_registration_data(item: frappe._dict, company_name: str) -> dict:
     valuation_rate = item.valuation_rate if item.valuation_rate is not None else 0
+    owner, modified_by = item.owner, item.modified_by
 
-    request_data = {
+    return {
+        **ITEM_REGISTRATION_TEMPLATE,
         "name": item.name,
-        "company_name": frappe.defaults.get_user_default("Company"),
+        "company_name": company_name,
         "itemCd": item.custom_item_code_etims,
         "itemClsCd": item.custom_item_classification,
         "itemTyCd": item.custom_product_type,
         "itemNm": item.item_name,
-        "temStdNm": None,
         "orgnNatCd": item.custom_etims_country_of_origin_code,
         "pkgUnitCd": item.custom_packaging_unit_code,
         "qtyUnitCd": item.custom_unit_of_quantity_code,
         "taxTyCd": item.get("custom_taxation_type", "B"),
-        "btchNo": None,
-        "bcd": None,
         "dftPrc": round(valuation_rate, 2),
-        "grpPrcL1": None,
-        "grpPrcL2": None,
-        "grpPrcL3": None,
-        "grpPrcL4": None,
-        "grpPrcL5": None,
-        "addInfo": None,
-        "sftyQty": None,
-        "isrcAplcbYn": "Y",
-        "useYn": "Y",
-        "regrId": split_user_email(item.owner),
-        "regrNm": item.owner,
-        "modrId": split_user_email(item.modified_by),
-        "modrNm": item.modified_by,
+        "regrId": split_user_email(owner),
+        "regrNm": owner,
+        "modrId": split_user_email(modified_by),
+        "modrNm": modified_by,
     }
 
-    perform_item_registration(json.dumps(request_data))
-
 
 @frappe.whitelist()
-def perform_customer_search(request_data: str, vendor: str = "OSCU KRA") -> None:
+def perform_customer_search(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Search customer details using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor)
-        # Create integration request BEFORE API call
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_customer",
-            reference_docname=data["name"],
-            reference_doctype="Customer",
-        )
-        response = client.select_customer({"custmTin": data["tax_id"]})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            customer_search_on_success(response, document_name=data["name"])
-            frappe.msgprint("Customer search completed successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/CustSearchReq", doctype="Customer", document_name=data["name"])
-        frappe.log_error(title="eTIMS Customer Search Error", message=str(e))
+    data: Dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        None,
+        "select_customer",
+        build_payload=lambda: {"custmTin": data["tax_id"]},
+        on_success=partial(customer_search_on_success, document_name=data["name"]),
+        success_message="Customer search completed successfully",
+        route="/CustSearchReq",
+        log_data=data,
+        reference_doctype="Customer",
+        reference_docname=data["name"],
+    )
 
 
 @frappe.whitelist()
-def perform_item_registration(request_data: str, vendor: str = "OSCU KRA") -> None:
+def perform_item_registration(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Register item using SDK"""
-    data: Dict = json.loads(request_data)
+    register_item(load_request_data(request_data), vendor)
+
+
+def register_item(
+    data: dict,
+    vendor: str = "OSCU KRA",
+    commit: bool = True,
+    integration_request_name: str | None = None,
+) -> None:
     company_name = data.pop("company_name")
     item_name = data["name"]
 
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor)
-        # Create integration request BEFORE API call
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_item",
-            reference_docname=item_name,
-            reference_doctype="Item",
-        )
-        # Prepare payload matching SDK expectations
-        payload = {
-            "itemCd": data["itemCd"],
-            "itemClsCd": data["itemClsCd"],
-            "itemTyCd": data["itemTyCd"],
-            "itemNm": data["itemNm"],
-            "orgnNatCd": data["orgnNatCd"],
-            "pkgUnitCd": data["pkgUnitCd"],
-            "qtyUnitCd": data["qtyUnitCd"],
-            "taxTyCd": data["taxTyCd"],
-            "dftPrc": data["dftPrc"],
-            "isrcAplcbYn": data["isrcAplcbYn"],
-            "useYn": data["useYn"],
-            "regrId": data["regrId"],
-            "regrNm": data["regrNm"],
-            "modrId": data["modrId"],
-            "modrNm": data["modrNm"],
-        }
-        response = client.save_item(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            item_registration_on_success(response, document_name=item_name)
-            frappe.msgprint("Item registered successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/ItemSaveReq", doctype="Item", document_name=item_name)
-        frappe.log_error(title="eTIMS Item Registration Error", message=str(e))
+    run_sdk_call(
+        company_name,
+        vendor,
+        None,
+        "save_item",
+        # Only the fields the SDK expects are sent
+        build_payload=lambda: {key: data[key] for key in ITEM_PAYLOAD_KEYS},
+        on_success=partial(item_registration_on_success, document_name=item_name),
+        success_message="Item registered successfully",
+        route="/ItemSaveReq",
+        log_data=data,
+        reference_doctype="Item",
+        reference_docname=item_name,
+        commit=commit,
+        integration_request_name=integration_request_name,
+    )
+
+
+ITEM_PAYLOAD_KEYS = (
+    "itemCd",
+    "itemClsCd",
+    "itemTyCd",
+    "itemNm",
+    "orgnNatCd",
+    "pkgUnitCd",
+    "qtyUnitCd",
+    "taxTyCd",
+    "dftPrc",
+    "isrcAplcbYn",
+    "useYn",
+    "regrId",
+    "regrNm",
+    "modrId",
+    "modrNm",
+)
+
 
 @frappe.whitelist()
-def send_insurance_details(request_data: str, vendor: str = "OSCU KRA") -> None:
+def send_insurance_details(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Submit insurance details using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    doc_name = data["name"]
-    branch_id = data.get("branch_id", "00")
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_branch_insurance",
-            reference_docname=doc_name,
-            reference_doctype="Customer",
-        )
-        payload = {
+    data: Dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        data.get("branch_id", "00"),
+        "save_branch_insurance",
+        build_payload=lambda: {
             "isrccCd": data["insurance_code"],
             "isrccNm": data["insurance_name"],
             "isrcRt": round(data["premium_rate"], 0),
@@ -340,57 +802,27 @@ def send_insurance_details(request_data: str, vendor: str = "OSCU KRA") -> None:
             "regrId": split_user_email(data["registration_id"]),
             "modrNm": data["modifier_id"],
             "modrId": split_user_email(data["modifier_id"]),
-        }
-        response = client.save_branch_insurance(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            customer_insurance_details_submission_on_success(response, document_name=doc_name)
-            frappe.msgprint("Insurance details submitted successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/BhfInsuranceSaveReq", doctype="Customer", document_name=doc_name)
-        frappe.log_error(title="eTIMS Insurance Submission Error", message=str(e))
+        },
+        on_success=partial(customer_insurance_details_submission_on_success, document_name=data["name"]),
+        success_message="Insurance details submitted successfully",
+        route="/BhfInsuranceSaveReq",
+        log_data=data,
+        reference_doctype="Customer",
+        reference_docname=data["name"],
+    )
+
 
 @frappe.whitelist()
-def send_branch_customer_details(request_data: str, vendor: str = "OSCU KRA") -> None:
+def send_branch_customer_details(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Submit branch customer details using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    doc_name = data["name"]
-    branch_id = data.get("branch_id", "00")
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_branch_customer",
-            reference_docname=doc_name,
-            reference_doctype="Customer",
-        )
-        payload = {
+    data: Dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        data.get("branch_id", "00"),
+        "save_branch_customer",
+        build_payload=lambda: {
             "custNo": data["name"][:14],
             "custTin": data["customer_pin"],
             "custNm": data["customer_name"],
@@ -404,60 +836,30 @@ def send_branch_customer_details(request_data: str, vendor: str = "OSCU KRA") ->
             "regrId": split_user_email(data["registration_id"]),
             "modrNm": data["modifier_id"],
             "modrId": split_user_email(data["modifier_id"]),
-        }
-        response = client.save_branch_customer(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            customer_branch_details_submission_on_success(response, document_name=doc_name)
-            frappe.msgprint("Customer branch details submitted successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/BhfCustSaveReq", doctype="Customer", document_name=doc_name)
-        frappe.log_error(title="eTIMS Branch Customer Submission Error", message=str(e))
+        },
+        on_success=partial(customer_branch_details_submission_on_success, document_name=data["name"]),
+        success_message="Customer branch details submitted successfully",
+        route="/BhfCustSaveReq",
+        log_data=data,
+        reference_doctype="Customer",
+        reference_docname=data["name"],
+    )
+
 
 @frappe.whitelist()
-def save_branch_user_details(request_data: str, vendor: str = "OSCU KRA") -> None:
+def save_branch_user_details(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Submit branch user details using SDK with SECURE password generation"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    doc_name = data["name"]
-    branch_id = data.get("branch_id", "00")
-    
+    data: Dict = load_request_data(request_data)
+
     # Generate secure random password (12 chars)
     secure_password = random_string(12)
 
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data={**data, "pwd": "[REDACTED]"},  # Don't log actual password
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_branch_user",
-            reference_docname=doc_name,
-            reference_doctype=USER_DOCTYPE_NAME,
-        )
-        payload = {
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        data.get("branch_id", "00"),
+        "save_branch_user",
+        build_payload=lambda: {
             "userId": data["user_id"],
             "userNm": data["full_names"],
             "pwd": secure_password,  # ✅ SECURE PASSWORD
@@ -470,93 +872,41 @@ def save_branch_user_details(request_data: str, vendor: str = "OSCU KRA") -> Non
             "regrId": split_user_email(data["registration_id"]),
             "modrNm": data["modifier_id"],
             "modrId": split_user_email(data["modifier_id"]),
-        }
-        response = client.save_branch_user(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            user_details_submission_on_success(response, document_name=doc_name)
-            
-            # Notify user of generated password
-            frappe.msgprint(
-                f"""Branch user details submitted successfully.<br>
+        },
+        on_success=partial(user_details_submission_on_success, document_name=data["name"]),
+        # Notify user of generated password
+        success_message=f"""Branch user details submitted successfully.<br>
                 <b>Generated Password:</b> {secure_password}<br>
-                <span style='color:orange'>⚠️ User must change password on first login</span>""",
-                indicator="green"
-            )
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/BhfUserSaveReq", doctype=USER_DOCTYPE_NAME, document_name=doc_name)
-        frappe.log_error(title="eTIMS Branch User Submission Error", message=str(e))
+                <span style='color:orange'>⚠️ User must change password on first login</span>""",
+        success_indicator="green",
+        route="/BhfUserSaveReq",
+        log_data={**data, "pwd": "[REDACTED]"},  # Don't log actual password
+        reference_doctype=USER_DOCTYPE_NAME,
+        reference_docname=data["name"],
+    )
+
 
 @frappe.whitelist()
-def perform_import_item_search(request_data: str, vendor: str = "OSCU KRA") -> None:
+def perform_import_item_search(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Search imported items using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    branch_id = data.get("branch_id", "00")
+    data: Dict = load_request_data(request_data)
 
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_imported_items",
-            reference_docname=None,
-            reference_doctype="Item",
-        )
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        data.get("branch_id", "00"),
+        "select_imported_items",
         # Get last request date from routes table or default to 1 year ago
-        last_req_dt = (datetime.now() - timedelta(days=365)).strftime("%Y%m%d%H%M%S")
-        response = client.select_imported_items({"lastReqDt": last_req_dt})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            imported_items_search_on_success(response)
-            frappe.msgprint("Imported items search completed")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/ImportItemSearchReq", doctype="Item", document_name=None)
-        frappe.log_error(title="eTIMS Imported Items Search Error", message=str(e))
+        build_payload=lambda: {
+            "lastReqDt": last_request_date(365)
+        },
+        on_success=imported_items_search_on_success,
+        success_message="Imported items search completed",
+        route="/ImportItemSearchReq",
+        log_data=data,
+        reference_doctype="Item",
+        serialise_output=dump_response_summary,
+    )
 
 
 @frappe.whitelist()
@@ -567,143 +917,167 @@ def perform_import_item_search_all_branches() -> None:
         filters={"is_active": 1},
         fields=["name", "bhfid", "company"],
     )
+    # One background job per branch, so the searches run side by side instead
+    # of one after the other inside this request
     for credential in all_credentials:
-        request_data = json.dumps({
-            "company_name": credential.company,
-            "branch_id": credential.bhfid
-        })
-        perform_import_item_search(request_data)
+        frappe.enqueue(
+            perform_import_item_search,
+            queue="default",
+            timeout=300,
+            job_name=f"{credential.company}_{credential.bhfid}_import_item_search",
+            job_id=f"import_item_search:{credential.company}:{credential.bhfid}",
+            deduplicate=True,
+            request_data={
+                "company_name": credential.company,
+                "branch_id": credential.bhfid,
+            },
+        )
 
 
 @frappe.whitelist()
-def submit_inventory(request_data: str, vendor: str = "OSCU KRA") -> None:
+def submit_inventory(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Submit stock master using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = frappe.defaults.get_user_default("Company")
-    doc_name = data["name"]
-    branch_id = data["branch_id"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_stock_master",
-            reference_docname=doc_name,
-            reference_doctype="Stock Ledger Entry",
-        )
-        payload = {
+    data: Dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data.get("company_name") or frappe.defaults.get_user_default("Company"),
+        vendor,
+        data["branch_id"],
+        "save_stock_master",
+        build_payload=lambda: {
             "itemCd": data["item_code"],
             "rsdQty": data["residual_qty"],
             "regrId": split_user_email(data["owner"]),
             "regrNm": data["owner"],
             "modrId": split_user_email(data["owner"]),
             "modrNm": data["owner"],
-        }
-        response = client.save_stock_master(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            submit_inventory_on_success(response, document_name=doc_name)
-            frappe.msgprint("Inventory submitted successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/StockMasterSaveReq", doctype="Stock Ledger Entry", document_name=doc_name)
-        frappe.log_error(title="eTIMS Inventory Submission Error", message=str(e))
+        },
+        on_success=partial(submit_inventory_on_success, document_name=data["name"]),
+        success_message="Inventory submitted successfully",
+        route="/StockMasterSaveReq",
+        log_data=data,
+        reference_doctype="Stock Ledger Entry",
+        reference_docname=data["name"],
+    )
+
+
+def submit_inventories(stock_ledgers: list[dict], vendor: str = "OSCU KRA") -> None:
+    """Submit the stock master of several Stock Ledger Entries side by side.
+
+    Only the SDK calls run on the worker threads, over the client's pooled
+    session; payloads are built and outcomes logged and applied on the calling
+    thread, as frappe.db is not shared across threads.
+    """
+    # Batches are cut afresh on every run, so one may overlap an earlier batch
+    # that has since been sent; drop the entries already submitted
+    submitted = set(frappe.get_all(
+        "Stock Ledger Entry",
+        {
+            "name": ["in", [stock_ledger["name"] for stock_ledger in stock_ledgers]],
+            "custom_inventory_submitted_successfully": 1,
+        },
+        pluck="name",
+    ))
+
+    by_branch: dict[tuple[str, str], list[dict]] = defaultdict(list)
+    for stock_ledger in stock_ledgers:
+        if stock_ledger["name"] in submitted:
+            continue
+
+        by_branch[(stock_ledger["company_name"], stock_ledger["branch_id"])].append(stock_ledger)
+
+    for (company_name, branch_id), entries in by_branch.items():
+        try:
+            client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
+            # Workers have no frappe context, so they can't reach the shared token
+            # in Redis: fetch it here, where it is memoised on the client for them
+            client.auth.token()
+        except Exception as e:
+            frappe.log_error(title="eTIMS Inventory Submission Error", message=str(e))
+            continue
+
+        payloads = [
+            {
+                "itemCd": data["item_code"],
+                "rsdQty": data["residual_qty"],
+                "regrId": split_user_email(data["owner"]),
+                "regrNm": data["owner"],
+                "modrId": split_user_email(data["owner"]),
+                "modrNm": data["owner"],
+            }
+            for data in entries
+        ]
+
+        def save(payload: dict) -> tuple[dict | None, str | None]:
+            try:
+                return client.save_stock_master(payload), None
+            except Exception as e:
+                return None, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(COMPOSITION_SUBMISSION_WORKERS, len(payloads)))) as executor:
+            results = list(executor.map(save, payloads))
+
+        url = f"SDK:{client.config['env']}:save_stock_master"
+        audit = []
+        for data, (response, error) in zip(entries, results):
+            if error is None and response.get("resultCd") != "000":
+                error = response.get("resultMsg", "Unknown error")
+
+            audit.append({
+                "data": data,
+                "url": url,
+                "reference_doctype": "Stock Ledger Entry",
+                "reference_docname": data["name"],
+                "status": "Failed" if error else "Completed",
+                "output": None if error else dump_response(response),
+                "error": error,
+            })
+
+            if error:
+                try:
+                    on_error(error, url="/StockMasterSaveReq", doctype="Stock Ledger Entry", document_name=data["name"])
+                except frappe.InvalidStatusError:
+                    # Logged against the entry; carry on with the rest of the batch
+                    pass
+            else:
+                submit_inventory_on_success(response, document_name=data["name"])
+
+        insert_integration_requests(audit)
+
 
 @frappe.whitelist()
-def search_branch_request(request_data: str, vendor: str = "OSCU KRA") -> None:
+def search_branch_request(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Search branches using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
+    data: Dict = load_request_data(request_data)
 
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_branches",
-            reference_docname=None,
-            reference_doctype="Branch",
-        )
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        None,
+        "select_branches",
         # Use fixed date as per KRA requirements for initial sync
-        response = client.select_branches({"lastReqDt": "20240101000000"})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            search_branch_request_on_success(response)
-            frappe.msgprint("Branch search completed successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/BhfSearchReq", doctype="Branch", document_name=None)
-        frappe.log_error(title="eTIMS Branch Search Error", message=str(e))
+        build_payload=lambda: {"lastReqDt": "20240101000000"},
+        on_success=search_branch_request_on_success,
+        success_message="Branch search completed successfully",
+        route="/BhfSearchReq",
+        log_data=data,
+        reference_doctype="Branch",
+    )
+
 
 @frappe.whitelist()
-def send_imported_item_request(request_data: str, vendor: str = "OSCU KRA") -> None:
+def send_imported_item_request(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Update imported item using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    doc_name = data["name"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:update_imported_item",
-            reference_docname=doc_name,
-            reference_doctype="Item",
-        )
-        declaration_date = build_datetime_from_string(
-            data["declaration_date"], "%Y-%m-%d %H:%M:%S.%f"
-        ).strftime("%Y%m%d")
-        payload = {
+    data: Dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        None,
+        "update_imported_item",
+        build_payload=lambda: {
             "taskCd": data["task_code"],
-            "dclDe": declaration_date,
+            "dclDe": compact_etims_date(data["declaration_date"]),
             "itemSeq": data["item_sequence"],
             "hsCd": data["hs_code"],
             "itemClsCd": data["item_classification_code"],
@@ -712,193 +1086,139 @@ def send_imported_item_request(request_data: str, vendor: str = "OSCU KRA") -> N
             "remark": None,
             "modrNm": data["modified_by"],
             "modrId": split_user_email(data["modified_by"]),
-        }
-        response = client.update_imported_item(payload)
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            imported_item_submission_on_success(response, document_name=doc_name)
-            frappe.msgprint("Imported item updated successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/ImportItemUpdateReq", doctype="Item", document_name=doc_name)
-        frappe.log_error(title="eTIMS Imported Item Update Error", message=str(e))
+        },
+        on_success=partial(imported_item_submission_on_success, document_name=data["name"]),
+        success_message="Imported item updated successfully",
+        route="/ImportItemUpdateReq",
+        log_data=data,
+        reference_doctype="Item",
+        reference_docname=data["name"],
+    )
+
 
 @frappe.whitelist()
-def perform_notice_search(request_data: str, vendor: str = "OSCU KRA") -> None:
+def perform_notice_search(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Search notices using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor)
-        last_req_dt = (datetime.now() - timedelta(days=30)).strftime("%Y%m%d%H%M%S")
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_notice_list",
-            reference_docname=data.get("name"),
+    data: Dict = load_request_data(request_data)
+
+    # Repeated clicks or an overlapping scheduler run reuse the search in flight
+    with single_search("notice_search", data["company_name"], None) as acquired:
+        if not acquired:
+            frappe.msgprint("A notice search for this company is already running")
+            return
+
+        run_sdk_call(
+            data["company_name"],
+            vendor,
+            None,
+            "select_notice_list",
+            build_payload=lambda: {
+                "lastReqDt": last_request_date(30)
+            },
+            on_success=notices_search_on_success,
+            success_message="Notice search completed successfully",
+            route="/NoticeSearchReq",
+            log_data=data,
             reference_doctype=SETTINGS_DOCTYPE_NAME,
+            reference_docname=data.get("name"),
         )
-        response = client.select_notice_list({"lastReqDt": last_req_dt})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            notices_search_on_success(response)
-            frappe.msgprint("Notice search completed successfully")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/NoticeSearchReq", doctype=SETTINGS_DOCTYPE_NAME, document_name=data.get("name"))
-        frappe.log_error(title="eTIMS Notice Search Error", message=str(e))
 
 
 @frappe.whitelist()
-def perform_stock_movement_search(request_data: str, vendor: str = "OSCU KRA") -> None:
+def perform_stock_movement_search(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Search stock movements using SDK"""
-    data: Dict = json.loads(request_data)
-    company_name = data["company_name"]
-    branch_id = data["branch_id"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_stock_movements",
-            reference_docname=None,
-            reference_doctype=None,
+    data: Dict = load_request_data(request_data)
+
+    with single_search("stock_movement_search", data["company_name"], data["branch_id"]) as acquired:
+        if not acquired:
+            frappe.msgprint("A stock movement search for this branch is already running")
+            return
+
+        run_sdk_call(
+            data["company_name"],
+            vendor,
+            data["branch_id"],
+            "select_stock_movement",
+            build_payload=lambda: {
+                "lastReqDt": last_request_date(7)
+            },
+            on_success=stock_mvt_search_on_success,
+            success_message="Stock movement search completed",
+            route="/StockMoveReq",
+            log_data=data,
+            log_name="select_stock_movements",
         )
-        last_req_dt = (datetime.now() - timedelta(days=7)).strftime("%Y%m%d%H%M%S")
-        response = client.select_stock_movement({"lastReqDt": last_req_dt})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            stock_mvt_search_on_success(response)
-            frappe.msgprint("Stock movement search completed")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/StockMoveReq", doctype=None, document_name=None)
-        frappe.log_error(title="eTIMS Stock Movement Search Error", message=str(e))
 
 
 
 @frappe.whitelist()
 def perform_stock_movement_search_all_branches() -> None:
     """Perform stock movement search for all active branches"""
+    # A fixed job id lets repeated clicks collapse into the job already queued
+    frappe.enqueue(
+        stock_movement_search_all_branches_job,
+        queue="default",
+        timeout=1800,
+        job_name="stock_movement_search_all_branches",
+        job_id="stock_movement_search_all_branches",
+        deduplicate=True,
+    )
+
+
+def stock_movement_search_all_branches_job() -> None:
+    """Search every active branch in turn from one job, on this worker's memoised clients"""
     all_credentials = frappe.get_all(
         SETTINGS_DOCTYPE_NAME,
         filters={"is_active": 1},
         fields=["name", "bhfid", "company"],
     )
     for credential in all_credentials:
-        request_data = json.dumps({
+        perform_stock_movement_search({
             "company_name": credential.company,
             "branch_id": credential.bhfid
         })
-        perform_stock_movement_search(request_data)
+
+
+# Concurrent saveItemComposition (and saveStockMaster) calls; the session's pool size
+COMPOSITION_SUBMISSION_WORKERS = 8
 
 
 @frappe.whitelist()
-def submit_item_composition(request_data: str, vendor: str = "OSCU KRA") -> None:
+def submit_item_composition(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
     """Submit item composition (BOM) using SDK"""
-    data: Dict = json.loads(request_data)
+    data: Dict = load_request_data(request_data)
     company_name = data["company_name"]
     doc_name = data["name"]
 
+    url = None
+    integration_request = None
     try:
         client = EtimsSDKWrapper.get_client(company_name, vendor)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:save_item_composition",
-            reference_docname=doc_name,
-            reference_doctype="BOM",
-        )
+        url = f"SDK:{client.config['env']}:save_item_composition"
+
         # Check if manufactured item is registered
-        manufactured_item = frappe.get_value(
+        manufactured_item = frappe.get_cached_value(
             "Item",
-            {"name": data["item_name"]},
+            data["item_name"],
             ["custom_item_registered", "name"],
             as_dict=True,
         )
         if not manufactured_item or not manufactured_item.custom_item_registered:
             frappe.throw(
-                f"Please register item: <b>{manufactured_item.name}</b> first to proceed.",
+                f"Please register item: <b>{data['item_name']}</b> first to proceed.",
                 title="Integration Error",
             )
         
-        # Verify all component items are registered (optimized lookup)
-        component_codes = [item["item_code"] for item in data["items"]]
-        registered_codes = set(frappe.db.get_list(
+        # Verify all component items are registered (optimized lookup); a
+        # component repeated in the BOM is only looked up once
+        component_codes = list(dict.fromkeys(item["item_code"] for item in data["items"]))
+        registered_codes = set(frappe.get_all(
             "Item",
             filters={"item_code": ["in", component_codes], "custom_item_registered": 1},
             pluck="item_code"
         ))
         
-        missing_codes = [code for code in component_codes if code not in registered_codes]
+        missing_codes = sorted(set(component_codes) - registered_codes)
         if missing_codes:
             frappe.throw(
                 f"Items not registered: <b>{', '.join(missing_codes)}</b>. "
@@ -906,72 +1226,113 @@ def submit_item_composition(request_data: str, vendor: str = "OSCU KRA") -> None
                 title="Integration Error",
             )
         
-        # Submit composition for each component
-        for item in data["items"]:
-            payload = {
+        # eTIMS takes one component per call; send them side by side over the
+        # client's pooled session instead of one round-trip after another
+        registration_id = split_user_email(data["registration_id"])
+        payloads = [
+            {
                 "itemCd": data["item_code"],
                 "cpstItemCd": item["item_code"],
                 "cpstQty": item["qty"],
-                "regrId": split_user_email(data["registration_id"]),
+                "regrId": registration_id,
                 "regrNm": data["registration_id"],
             }
-            response = client.save_item_composition(payload)
+            for item in data["items"]
+        ]
+
+        # Workers have no frappe context, so they can't reach the shared token in
+        # Redis: fetch it here, where it is memoised on the client for them
+        client.auth.token()
+        with ThreadPoolExecutor(max_workers=max(1, min(COMPOSITION_SUBMISSION_WORKERS, len(payloads)))) as executor:
+            responses = list(executor.map(client.save_item_composition, payloads))
+
+        for payload, response in zip(payloads, responses):
             if response.get("resultCd") != "000":
-                frappe.msgprint(f"Failed to submit composition for {item['item_code']}: "
+                frappe.msgprint(f"Failed to submit composition for {payload['cpstItemCd']}: "
                     f"{response.get('resultMsg', 'Unknown error')}",)
-        update_integration_request_status(
-            integration_request.name,
+        integration_request = insert_integration_request(
+            data=data,
+            url=url,
+            reference_doctype="BOM",
+            reference_docname=doc_name,
             status="Completed",
             output="Item composition submitted successfully",
-            error=None
         )
         item_composition_submission_on_success(None, document_name=doc_name)
         frappe.msgprint("Item composition submitted successfully")
     except Exception as e:
-        if 'integration_request' in locals():
+        if integration_request is not None:
             update_integration_request_status(
                 integration_request.name,
                 status="Failed",
                 output=None,
                 error=str(e)
             )
+        elif url:
+            insert_integration_request(
+                data=data,
+                url=url,
+                reference_doctype="BOM",
+                reference_docname=doc_name,
+                status="Failed",
+                error=str(e),
+            )
         on_error(str(e), url="/SaveItemComposition", doctype="BOM", document_name=doc_name)
         frappe.log_error(title="eTIMS Item Composition Error", message=str(e))
 
+
+# Kept across pings so repeated checks from the settings form reuse the connection
+_ping_session = requests.Session()
+
+
 @frappe.whitelist()
-def ping_server(request_data: str) -> None:
+def ping_server(request_data: str | dict) -> None:
     """Check server connectivity using a simple HTTP request"""
-    import json
-    import requests
+    url = load_request_data(request_data)["server_url"]
 
     try:
-        url = json.loads(request_data)["server_url"]
-
-        response = requests.request(
-            method="HEAD",   # or "GET" if the server blocks HEAD
-            url=url,
-            timeout=5,
-            allow_redirects=True,
-        )
-
+        response = _ping_session.head(url, timeout=5, allow_redirects=True)
         is_online = response.status_code < 400
 
         frappe.msgprint(
             "The Server is Online" if is_online else "The Server is Offline"
         )
 
-    except Exception as e:
+    except requests.RequestException as e:
         frappe.msgprint("The Server is Offline")
         frappe.log_error(title="Server Ping Error", message=str(e))
 
 @frappe.whitelist()
-def create_stock_entry_from_stock_movement(request_data: str) -> None:
-    data = json.loads(request_data)
+def create_stock_entry_from_stock_movement(request_data: str | dict) -> None:
+    data = load_request_data(request_data)
     
-    # Create missing items
-    for item in data["items"]:
-        if not frappe.db.exists("Item", item["item_name"], cache=False):
-            create_item(item)
+    # Create missing items, checking all of them in one query
+    existing_items = set(
+        frappe.get_all(
+            "Item",
+            filters={"name": ["in", [item["item_name"] for item in data["items"]]]},
+            pluck="name",
+        )
+    )
+    created_items = [
+        create_item(item, auto_register=False)
+        for item in data["items"]
+        if item["item_name"] not in existing_items
+    ]
+
+    # Register the new items from one job, once they are committed, rather
+    # than with an eTIMS call per item inside this request
+    names_to_register = [item.name for item in created_items if item.custom_item_classification]
+    if names_to_register:
+        frappe.enqueue(
+            bulk_register_items_job,
+            queue="default",
+            timeout=1800,
+            job_name="bulk_register_items",
+            enqueue_after_commit=True,
+            names=names_to_register,
+            company_name=frappe.defaults.get_user_default("Company"),
+        )
     
     # Get target branch from Company settings (replaces hardcoded "01")
     target_branch = get_first_branch_id()  # Fallback to first branch
@@ -979,21 +1340,19 @@ def create_stock_entry_from_stock_movement(request_data: str) -> None:
     # Create stock entry
     stock_entry = frappe.new_doc("Stock Entry")
     stock_entry.stock_entry_type = "Material Transfer"
-    stock_entry.set("items", [])
     
-    source_warehouse = frappe.get_value(
+    # Resolve both branches' warehouses together; the first match per branch
+    # wins, as with get_value
+    branch_warehouses = {}
+    for warehouse in frappe.get_all(
         "Warehouse",
-        {"custom_branch": data["branch_id"]},
-        ["name"],
-        as_dict=True,
-    )
-    
-    target_warehouse = frappe.get_value(
-        "Warehouse",
-        {"custom_branch": target_branch},
-        ["name"],
-        as_dict=True,
-    )
+        filters={"custom_branch": ["in", [data["branch_id"], target_branch]]},
+        fields=["name", "custom_branch"],
+    ):
+        branch_warehouses.setdefault(warehouse.custom_branch, warehouse)
+
+    source_warehouse = branch_warehouses.get(data["branch_id"])
+    target_warehouse = branch_warehouses.get(target_branch)
     
     if not source_warehouse or not target_warehouse:
         frappe.throw(
@@ -1002,23 +1361,30 @@ def create_stock_entry_from_stock_movement(request_data: str) -> None:
             title="Configuration Error"
         )
     
-    for item in data["items"]:
-        stock_entry.append(
-            "items",
+    stock_entry.set(
+        "items",
+        [
             {
                 "s_warehouse": source_warehouse.name,
                 "t_warehouse": target_warehouse.name,
                 "item_code": item["item_name"],
                 "qty": item["quantity"],
-            },
-        )
+            }
+            for item in data["items"]
+        ],
+    )
     
     stock_entry.save()
     frappe.msgprint(f"Stock Entry {stock_entry.name} created successfully")
 
 
-def create_item(item: dict | frappe._dict) -> Document:
-    """Create item from imported purchase/stock movement data"""
+def create_item(item: dict | frappe._dict, auto_register: bool = True) -> Document:
+    """Create item from imported purchase/stock movement data.
+
+    With auto_register, a new item that has a classification is registered
+    in eTIMS straight away; callers creating several items pass False and
+    register them together.
+    """
     item_code = item.get("item_code", None)
     
     # Check if item already exists by name or code
@@ -1064,7 +1430,7 @@ def create_item(item: dict | frappe._dict) -> Document:
     new_item.insert(ignore_mandatory=True, ignore_if_duplicate=True)
     
     # Auto-register if classification is set
-    if new_item.custom_item_classification:
+    if auto_register and new_item.custom_item_classification:
         process_single_item(new_item.name)
     
     return new_item
@@ -1072,17 +1438,23 @@ def create_item(item: dict | frappe._dict) -> Document:
 
 def validate_mapping_and_registration_of_items(items):
     """Validate items against registered imports"""
-    for item in items:
-        task_code = item.get("task_code") or item.get("item_name")
-        matched_items = frappe.get_all(
-            "Item",
-            filters={"custom_referenced_imported_item": task_code},
-            fields=["name", "item_name", "item_code"]
-        )
-        if matched_items:
-            item_name = matched_items[0].name
-            from kra_etims_frappe.kra_etims.overrides.server.purchase_invoice import validation_message
-            validation_message(item_name)
+    from kra_etims_frappe.kra_etims.overrides.server.purchase_invoice import validate_item_codes_registration
+
+    task_codes = [item.get("task_code") or item.get("item_name") for item in items]
+
+    # One query for every referenced import; the first match per task code
+    # wins, as it did with a query per item
+    mapped_items = {}
+    for matched_item in frappe.get_all(
+        "Item",
+        filters={"custom_referenced_imported_item": ["in", task_codes]},
+        fields=["name", "custom_referenced_imported_item"],
+    ):
+        mapped_items.setdefault(matched_item.custom_referenced_imported_item, matched_item.name)
+
+    mapped_item_names = [mapped_items[code] for code in task_codes if code in mapped_items]
+
+    validate_item_codes_registration(mapped_item_names)
 
 @frappe.whitelist()
 def perform_purchases_search_all_branches(request_data:str) -> None:
@@ -1092,59 +1464,27 @@ def perform_purchases_search_all_branches(request_data:str) -> None:
     )
 
     for credential in all_credentials:
-        request_data = json.dumps(
+        perform_purchases_search(
             {"company_name": credential.company, "branch_id": credential.bhfid}
         )
-        perform_purchases_search(request_data)
 
 @frappe.whitelist()
-def perform_purchases_search(request_data: str, vendor: str="OSCU KRA") -> None:
-    data: dict = json.loads(request_data)
-
-    company_name = data["company_name"]
-    branch_id=data["branch_id"]
-
-    try:
-        client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-        integration_request = create_request_log(
-            data=data,
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_purchases",
-            reference_docname=None,
-            reference_doctype=None,
-        )
-        last_req_dt = (datetime.now() - timedelta(days=7)).strftime("%Y%m%d%H%M%S")
-        response = client.select_purchases({"lastReqDt": last_req_dt})
-        
-        if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
-                status="Completed",
-                output=json.dumps(response),
-                error=None
-            )
-            purchase_search_on_success(response)
-            frappe.msgprint("Transaction Purchase Sales search completed")
-        else:
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
-            )
-            frappe.msgprint(response.get("resultMsg", "Unknown error"))
-    except Exception as e:
-        if 'integration_request' in locals():
-            update_integration_request_status(
-                integration_request.name,
-                status="Failed",
-                output=None,
-                error=str(e)
-            )
-        on_error(str(e), url="/TrnsPurchaseSalesReq", doctype=None, document_name=None)
-        frappe.log_error(title="eTIMS Transaction Purchase Sales Search Error", message=str(e))
+def perform_purchases_search(request_data: str | dict, vendor: str = "OSCU KRA") -> None:
+    data: dict = load_request_data(request_data)
+
+    run_sdk_call(
+        data["company_name"],
+        vendor,
+        data["branch_id"],
+        "select_purchases",
+        build_payload=lambda: {
+            "lastReqDt": last_request_date(7)
+        },
+        on_success=purchase_search_on_success,
+        success_message="Transaction Purchase Sales search completed",
+        route="/TrnsPurchaseSalesReq",
+        log_data=data,
+    )
 
 
 @frappe.whitelist()
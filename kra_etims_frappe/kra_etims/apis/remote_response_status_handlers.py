@@ -433,33 +433,38 @@ def imported_items_search_on_success(response: dict) -> None:
     )
    
 def search_branch_request_on_success(response: dict) -> None:
-    for branch in response["data"]["bhfList"]:
-        doc = None
-
-        try:
-            doc = frappe.get_doc(
-                "Branch",
-                {"branch": branch["bhfId"]},
-                for_update=True,
-            )
+    branches = response["data"]["bhfList"]
+
+    # Look up the branches already present in one query, rather than
+    # probing for each one and falling back on DoesNotExistError
+    existing_branches = {
+        existing.branch: existing.name
+        for existing in frappe.get_all(
+            "Branch",
+            filters={"branch": ["in", [branch["bhfId"] for branch in branches]]},
+            fields=["name", "branch"],
+        )
+    }
 
-        except frappe.exceptions.DoesNotExistError:
+    for branch in branches:
+        if branch["bhfId"] in existing_branches:
+            doc = frappe.get_doc("Branch", existing_branches[branch["bhfId"]], for_update=True)
+        else:
             doc = frappe.new_doc("Branch")
 
-        finally:
-            doc.branch = branch["bhfId"]
-            doc.custom_branch_code = branch["bhfId"]
-            doc.custom_pin = branch["tin"]
-            doc.custom_branch_name = branch["bhfNm"]
-            doc.custom_branch_status_code = branch["bhfSttsCd"]
-            doc.custom_county_name = branch["prvncNm"]
-            doc.custom_sub_county_name = branch["dstrtNm"]
-            doc.custom_tax_locality_name = branch["sctrNm"]
-            doc.custom_location_description = branch["locDesc"]
-            doc.custom_manager_name = branch["mgrNm"]
-            doc.custom_manager_contact = branch["mgrTelNo"]
-            doc.custom_manager_email = branch["mgrEmail"]
-            doc.custom_is_head_office = branch["hqYn"]
-            doc.custom_is_etims_branch = 1
-
-            doc.save()
+        doc.branch = branch["bhfId"]
+        doc.custom_branch_code = branch["bhfId"]
+        doc.custom_pin = branch["tin"]
+        doc.custom_branch_name = branch["bhfNm"]
+        doc.custom_branch_status_code = branch["bhfSttsCd"]
+        doc.custom_county_name = branch["prvncNm"]
+        doc.custom_sub_county_name = branch["dstrtNm"]
+        doc.custom_tax_locality_name = branch["sctrNm"]
+        doc.custom_location_description = branch["locDesc"]
+        doc.custom_manager_name = branch["mgrNm"]
+        doc.custom_manager_contact = branch["mgrTelNo"]
+        doc.custom_manager_email = branch["mgrEmail"]
+        doc.custom_is_head_office = branch["hqYn"]
+        doc.custom_is_etims_branch = 1
+
+        doc.save()
@@ -1,9 +1,11 @@
 import json
+from hashlib import blake2b
+from typing import Iterator
 
 import frappe
 import frappe.defaults
 from frappe.model.document import Document
-from frappe.integrations.utils import create_request_log
+from frappe.utils import create_batch, now_datetime
 
 from ..apis.remote_response_status_handlers import on_error
 from ..doctype.doctype_names_mapping import (
@@ -14,115 +16,104 @@ from ..doctype.doctype_names_mapping import (
     TAXATION_TYPE_DOCTYPE_NAME,
     UNIT_OF_QUANTITY_DOCTYPE_NAME,
 )
+from ..overrides.server.purchase_invoice import on_submit as purchase_invoice_on_submit
+from ..overrides.server.sales_invoice import on_submit as sales_invoice_on_submit
 from ..overrides.server.stock_ledger_entry import on_update
 from ..utils import (
     get_curr_env_etims_settings,
+    get_docs_in_bulk,
 )
 from ..apis.apis import  (
+    BULK_QUERY_BATCH_SIZE,
     EtimsSDKWrapper,
+    dump_response_summary,
+    insert_integration_request,
+    perform_notice_search,
+    submit_inventories,
     update_integration_request_status
 )
 
 
-def refresh_notices() -> None:
-    from ..apis.apis import perform_notice_search
+CODE_LISTS_DIGEST_KEY = "etims_code_lists_digest"
+ITEM_CLASSIFICATIONS_DIGEST_KEY = "etims_item_classifications_digest"
 
-    company = frappe.defaults.get_user_default("Company")
 
-    perform_notice_search(json.dumps({"company_name": company}))
+def get_response_digest(data: dict) -> str:
+    """Stable digest of a code-list payload, used to detect unchanged refreshes"""
+    return blake2b(
+        json.dumps(data, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
 
 
-def send_sales_invoices_information() -> None:
-    from ..overrides.server.sales_invoice import on_submit
+def refresh_notices() -> None:
+    company = frappe.defaults.get_user_default("Company")
 
-    all_submitted_unsent: list[Document] = frappe.get_all(
-        "Sales Invoice", {"docstatus": 1, "custom_successfully_submitted": 0, "is_opening":"No"}, ["name"]
-    )  
+    perform_notice_search({"company_name": company})
 
-    if all_submitted_unsent:
-        for sales_invoice in all_submitted_unsent:
-            doc = frappe.get_doc(
-                "Sales Invoice", sales_invoice.name, for_update=False
-            )  
 
-            try:
-                on_submit(
-                    doc, method=None
-                )  
+def iter_pending_docs(doctype: str, filters: dict) -> Iterator[Document]:
+    """Yield the matching documents, loaded a batch at a time instead of a get_doc each"""
+    names = frappe.get_all(doctype, filters, pluck="name")
 
-            except TypeError:
-                continue
+    for batch in create_batch(names, BULK_QUERY_BATCH_SIZE):
+        yield from get_docs_in_bulk(doctype, {"name": ["in", batch]})
 
 
-def send_pos_invoices_information() -> None:
-    from ..overrides.server.sales_invoice import on_submit
+def send_sales_invoices_information() -> None:
+    for doc in iter_pending_docs(
+        "Sales Invoice", {"docstatus": 1, "custom_successfully_submitted": 0, "is_opening": "No"}
+    ):
+        try:
+            sales_invoice_on_submit(doc, method=None)
 
-    all_pending_pos_invoices: list[Document] = frappe.get_all(
-        "POS Invoice", {"docstatus": 1, "custom_successfully_submitted": 0}, ["name"]
-    )
+        except TypeError:
+            continue
 
-    if all_pending_pos_invoices:
-        for pos_invoice in all_pending_pos_invoices:
-            doc = frappe.get_doc(
-                "POS Invoice", pos_invoice.name, for_update=False
-            )  # Refetch to get the document representation of the record
 
-            try:
-                on_submit(
-                    doc, method=None
-                )  # Delegate to the on_submit method for sales invoices
+def send_pos_invoices_information() -> None:
+    for doc in iter_pending_docs(
+        "POS Invoice", {"docstatus": 1, "custom_successfully_submitted": 0}
+    ):
+        try:
+            sales_invoice_on_submit(
+                doc, method=None
+            )  # Delegate to the on_submit method for sales invoices
 
-            except TypeError:
-                continue
+        except TypeError:
+            continue
 
 
 def send_stock_information() -> None:
-    all_stock_ledger_entries: list[Document] = frappe.get_all(
-        "Stock Ledger Entry",
-        {"docstatus": 1, "custom_submitted_successfully": 0},
-        ["name"],
-    )
-    for entry in all_stock_ledger_entries:
-        doc = frappe.get_doc(
-            "Stock Ledger Entry", entry.name, for_update=False
-        )  
-
+    for doc in iter_pending_docs(
+        "Stock Ledger Entry", {"docstatus": 1, "custom_submitted_successfully": 0}
+    ):
         try:
-            on_update(
-                doc, method=None
-            )  
+            on_update(doc, method=None)
 
         except TypeError:
             continue
 
 
 def send_purchase_information() -> None:
-    from ..overrides.server.purchase_invoice import on_submit
-
-    all_submitted_purchase_invoices: list[Document] = frappe.get_all(
-        "Purchase Invoice",
-        {"docstatus": 1, "custom_submitted_successfully": 0},
-        ["name"],
-    )
-
-    for invoice in all_submitted_purchase_invoices:
-        doc = frappe.get_doc(
-            "Purchase Invoice", invoice.name, for_update=False
-        )  # Refetch to get the document representation of the record
-
+    for doc in iter_pending_docs(
+        "Purchase Invoice", {"docstatus": 1, "custom_submitted_successfully": 0}
+    ):
         try:
-            on_submit(doc, method=None)
+            purchase_invoice_on_submit(doc, method=None)
 
         except TypeError:
             continue
 
 
-def send_item_inventory_information() -> None:
-    from ..apis.apis import submit_inventory
+# Stock ledger entries whose inventory is submitted by one background job
+INVENTORY_SUBMISSION_BATCH_SIZE = 100
 
+
+def send_item_inventory_information() -> None:
     query = """
         SELECT sle.name as name,
             sle.owner,
+            sle.company as company_name,
             sle.custom_submitted_successfully,
             sle.custom_inventory_submitted_successfully,
             qty_after_transaction as residual_qty,
@@ -140,15 +131,21 @@ def send_item_inventory_information() -> None:
 
     sles = frappe.db.sql(query, as_dict=True)
 
-    for stock_ledger in sles:
-        response = json.dumps(stock_ledger)
-
-        try:
-            submit_inventory(response)
-
-        except Exception as error:
-            # TODO: Suspicious looking type(error)
-            frappe.throw("Error Encountered", type(error), title="Error")
+    # Each submission is an eTIMS round trip; spread them over the workers in
+    # batches instead of making every one in turn from this job. The job id
+    # is derived from the entries, so a batch still queued or running when
+    # the cron fires again isn't queued a second time
+    for stock_ledgers in create_batch(sles, INVENTORY_SUBMISSION_BATCH_SIZE):
+        names = ",".join(stock_ledger.name for stock_ledger in stock_ledgers)
+        frappe.enqueue(
+            submit_inventories,
+            queue="default",
+            timeout=1800,
+            job_name=f"etims_inventory_{stock_ledgers[0].name}",
+            job_id=f"etims_inventory:{blake2b(names.encode(), digest_size=16).hexdigest()}",
+            deduplicate=True,
+            stock_ledgers=stock_ledgers,
+        )
 
 
 @frappe.whitelist()
@@ -160,38 +157,42 @@ def refresh_code_lists(vendor: str = "OSCU KRA") -> str:
         frappe.throw("No active company found. Please set a default company.", title="Configuration Error")
     
     def _refresh_codes():
+        url = None
+        integration_request = None
         try:
             client = EtimsSDKWrapper.get_client(company_name, vendor)
-            integration_request = create_request_log(
-                data={"purpose": "code_lists_refresh"},
-                is_remote_request=True,
-                service_name="eTIMS",
-                request_headers={},
-                url=f"SDK:{client.config['env']}:select_code_lists",
-                reference_docname=None,
-                reference_doctype=None,
-            )
+            url = f"SDK:{client.config['env']}:select_code_lists"
             
             # Hardcoded date to fetch ALL code lists (KRA requirement for initial sync)
             payload = {"lastReqDt": "20200101000000"}
             response = client.select_code_list(payload)
             
             if response.get("resultCd") == "000":
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data={"purpose": "code_lists_refresh"},
+                    url=url,
+                    reference_doctype=None,
+                    reference_docname=None,
                     status="Completed",
-                    output=json.dumps(response),
-                    error=None
+                    output=dump_response_summary(response),
                 )
-                # Execute all code list updaters
-                run_updater_functions(response)
-                frappe.msgprint("✅ Code lists refreshed successfully", indicator="green")
+                # Skip the updaters when KRA returned the same lists as last time
+                digest = get_response_digest(response["data"])
+                if digest == frappe.db.get_global(CODE_LISTS_DIGEST_KEY):
+                    frappe.msgprint("Code lists unchanged since the last refresh")
+                else:
+                    # Execute all code list updaters
+                    run_updater_functions(response)
+                    frappe.db.set_global(CODE_LISTS_DIGEST_KEY, digest)
+                    frappe.msgprint("✅ Code lists refreshed successfully", indicator="green")
             else:
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data={"purpose": "code_lists_refresh"},
+                    url=url,
+                    reference_doctype=None,
+                    reference_docname=None,
                     status="Failed",
-                    output=None,
-                    error=response.get("resultMsg", "Unknown error")
+                    error=response.get("resultMsg", "Unknown error"),
                 )
                 on_error(
                     response.get("resultMsg", "Unknown error"),
@@ -204,13 +205,22 @@ def refresh_code_lists(vendor: str = "OSCU KRA") -> str:
                     message=f"Response: {json.dumps(response)}"
                 )
         except Exception as e:
-            if 'integration_request' in locals():
+            if integration_request is not None:
                 update_integration_request_status(
                     integration_request.name,
                     status="Failed",
                     output=None,
                     error=str(e)
                 )
+            elif url:
+                insert_integration_request(
+                    data={"purpose": "code_lists_refresh"},
+                    url=url,
+                    reference_doctype=None,
+                    reference_docname=None,
+                    status="Failed",
+                    error=str(e),
+                )
             on_error(str(e), url="/CodeSearchReq", doctype=None, document_name=None)
             frappe.log_error(title="eTIMS Code Lists Refresh Error", message=str(e))
             frappe.msgprint("❌ Code lists refresh failed. Check Error Log.", indicator="red")
@@ -233,112 +243,42 @@ def get_item_classification_codes(vendor: str = "OSCU KRA") -> str:
     if not company_name:
         frappe.throw("No active company found. Please set a default company.", title="Configuration Error")
     
-    def _fetch_classifications():
-        try:
-            client = EtimsSDKWrapper.get_client(company_name, vendor)
-            integration_request = create_request_log(
-                data={"purpose": "item_classification_refresh"},
-                is_remote_request=True,
-                service_name="eTIMS",
-                request_headers={},
-                url=f"SDK:{client.config['env']}:select_item_classifications",
-                reference_docname=None,
-                reference_doctype=SETTINGS_DOCTYPE_NAME,
-            )
-            
-            # Hardcoded date to fetch ALL classifications (KRA requirement)
-            payload = {"lastReqDt": "20230101000000"}
-            response = client.select_item_classes(payload)
-            
-            if response.get("resultCd") == "000":
-                update_integration_request_status(
-                    integration_request.name,
-                    status="Completed",
-                    output=json.dumps(response),
-                    error=None
-                )
-                update_item_classification_codes(response)
-                frappe.msgprint("✅ Item classification codes updated successfully", indicator="green")
-            else:
-                update_integration_request_status(
-                    integration_request.name,
-                    status="Failed",
-                    output=None,
-                    error=response.get("resultMsg", "Unknown error")
-                )
-                on_error(
-                    response.get("resultMsg", "Unknown error"),
-                    url="/ItemClsSearchReq",
-                    doctype=SETTINGS_DOCTYPE_NAME,
-                    document_name=None,
-                )
-                frappe.log_error(
-                    title="eTIMS Item Classification Refresh Failed",
-                    message=f"Response: {json.dumps(response)}"
-                )
-        except Exception as e:
-            if 'integration_request' in locals():
-                update_integration_request_status(
-                    integration_request.name,
-                    status="Failed",
-                    output=None,
-                    error=str(e)
-                )
-            on_error(str(e), url="/ItemClsSearchReq", doctype=SETTINGS_DOCTYPE_NAME, document_name=None)
-            frappe.log_error(title="eTIMS Item Classification Error", message=str(e))
-            frappe.msgprint("❌ Item classification refresh failed. Check Error Log.", indicator="red")
-
-    frappe.enqueue(
-        _fetch_classifications,
-        is_async=True,
-        queue="long",
-        timeout=1200,  # 20 minutes
-        job_name="etims_refresh_item_classifications",
-    )
-    return "Item classification refresh job enqueued"
-
-
-@frappe.whitelist()
-def get_item_classification_codes(vendor: str = "OSCU KRA") -> str:
-    """Fetch and update item classification codes using SDK (async)"""
-    company_name: str | None = frappe.defaults.get_user_default("Company")
-    
-    if not company_name:
-        frappe.throw("No active company found. Please set a default company.", title="Configuration Error")
-    
+    url = None
+    integration_request = None
     try:
         client = EtimsSDKWrapper.get_client(company_name, vendor)
-        integration_request = create_request_log(
-            data={"purpose": "item_classification_refresh"},
-            is_remote_request=True,
-            service_name="eTIMS",
-            request_headers={},
-            url=f"SDK:{client.config['env']}:select_item_classifications",
-            reference_docname=None,
-            reference_doctype=SETTINGS_DOCTYPE_NAME,
-        )
+        url = f"SDK:{client.config['env']}:select_item_classifications"
         
         # Hardcoded date to fetch ALL classifications (KRA requirement for initial sync)
         payload = {"lastReqDt": "20230101000000"}
         response = client.select_item_classes(payload)
         
         if response.get("resultCd") == "000":
-            update_integration_request_status(
-                integration_request.name,
+            integration_request = insert_integration_request(
+                data={"purpose": "item_classification_refresh"},
+                url=url,
+                reference_doctype=SETTINGS_DOCTYPE_NAME,
+                reference_docname=None,
                 status="Completed",
-                output=json.dumps(response),
-                error=None
+                output=dump_response_summary(response),
             )
-            # Update local item classification codes
-            update_item_classification_codes(response)
-                            
-            frappe.msgprint("✅ Item classification codes updated successfully", indicator="green")
+            # Update local item classification codes, unless KRA returned the same list as last time
+            digest = get_response_digest(response["data"])
+            if digest == frappe.db.get_global(ITEM_CLASSIFICATIONS_DIGEST_KEY):
+                frappe.msgprint("Item classification codes unchanged since the last refresh")
+            else:
+                update_item_classification_codes(response)
+                frappe.db.set_global(ITEM_CLASSIFICATIONS_DIGEST_KEY, digest)
+
+                frappe.msgprint("✅ Item classification codes updated successfully", indicator="green")
         else:
-            update_integration_request_status(
-                integration_request.name,
+            integration_request = insert_integration_request(
+                data={"purpose": "item_classification_refresh"},
+                url=url,
+                reference_doctype=SETTINGS_DOCTYPE_NAME,
+                reference_docname=None,
                 status="Failed",
-                output=None,
-                error=response.get("resultMsg", "Unknown error")
+                error=response.get("resultMsg", "Unknown error"),
             )
             on_error(
                 response.get("resultMsg", "Unknown error"),
@@ -352,13 +292,22 @@ def get_item_classification_codes(vendor: str = "OSCU KRA") -> str:
             )
     except Exception as e:
         # Handle integration request cleanup if it was created
-        if 'integration_request' in locals():
+        if integration_request is not None:
             update_integration_request_status(
                 integration_request.name,
                 status="Failed",
                 output=None,
                 error=str(e)
             )
+        elif url:
+            insert_integration_request(
+                data={"purpose": "item_classification_refresh"},
+                url=url,
+                reference_doctype=SETTINGS_DOCTYPE_NAME,
+                reference_docname=None,
+                status="Failed",
+                error=str(e),
+            )
         # Call error handler and log
         on_error(str(e), url="/ItemClsSearchReq", doctype=SETTINGS_DOCTYPE_NAME, document_name=None)
         frappe.log_error(title="eTIMS Item Classification Error", message=str(e))
@@ -368,147 +317,149 @@ def get_item_classification_codes(vendor: str = "OSCU KRA") -> str:
 
 
 def run_updater_functions(response: dict) -> None:
-    for class_list in response["data"]["clsList"]:
-        if class_list["cdClsNm"] == "Quantity Unit":
-            update_unit_of_quantity(class_list)
-
-        if class_list["cdClsNm"] == "Taxation Type":
-            update_taxation_type(class_list)
-
-        if class_list["cdClsNm"] == "Packing Unit":
-            update_packaging_units(class_list)
-
-        if class_list["cdClsNm"] == "Country":
-            update_countries(class_list)
-
-
-def update_unit_of_quantity(data: dict) -> None:
-    doc: Document | None = None
+    """Apply every code list in one transaction, so a failed refresh leaves none half-written"""
+    try:
+        for class_list in response["data"]["clsList"]:
+            if class_list["cdClsNm"] == "Quantity Unit":
+                update_unit_of_quantity(class_list)
 
-    for unit_of_quantity in data["dtlList"]:
-        try:
-            doc = frappe.get_doc(UNIT_OF_QUANTITY_DOCTYPE_NAME, unit_of_quantity["cd"])
+            if class_list["cdClsNm"] == "Taxation Type":
+                update_taxation_type(class_list)
 
-        except frappe.DoesNotExistError:
-            doc = frappe.new_doc(UNIT_OF_QUANTITY_DOCTYPE_NAME)
+            if class_list["cdClsNm"] == "Packing Unit":
+                update_packaging_units(class_list)
 
-        finally:
-            doc.code = unit_of_quantity["cd"]
-            doc.sort_order = unit_of_quantity["srtOrd"]
-            doc.code_name = unit_of_quantity["cdNm"]
-            doc.code_description = unit_of_quantity["cdDesc"]
+            if class_list["cdClsNm"] == "Country":
+                update_countries(class_list)
 
-            doc.save()
+    except Exception:
+        frappe.db.rollback()
+        raise
 
     frappe.db.commit()
 
 
-def update_taxation_type(data: dict) -> None:
-    doc: Document | None = None
-
-    for taxation_type in data["dtlList"]:
-        try:
-            doc = frappe.get_doc(TAXATION_TYPE_DOCTYPE_NAME, taxation_type["cd"])
+def bulk_upsert(doctype: str, rows: list[dict]) -> None:
+    """Insert or update rows by name with one statement per batch.
+
+    Prefer Raw SQL since using the ORM causes performance degradation; the
+    code list doctypes have no controller logic for save() to run. Every row
+    must have the same keys, in the same order, starting with name.
+    """
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    audit = {"creation": now, "modified": now, "owner": user, "modified_by": user}
+    audit_values = tuple(audit.values())
+
+    columns = [*rows[0], *audit]
+    updated_columns = [column for column in columns if column not in ("name", "creation", "owner")]
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+
+    for batch in create_batch(rows, BULK_QUERY_BATCH_SIZE):
+        # Flatten the batch into one parameter list without a tuple per row
+        values = []
+        for row in batch:
+            values.extend(row.values())
+            values.extend(audit_values)
+
+        frappe.db.sql(
+            f"""
+                INSERT INTO `tab{doctype}` ({", ".join(f"`{column}`" for column in columns)})
+                VALUES {", ".join([placeholders] * len(batch))}
+                ON DUPLICATE KEY UPDATE
+                    {", ".join(f"`{column}` = VALUES(`{column}`)" for column in updated_columns)}
+            """,
+            values,
+        )
 
-        except frappe.DoesNotExistError:
-            doc = frappe.new_doc(TAXATION_TYPE_DOCTYPE_NAME)
 
-        finally:
-            doc.cd = taxation_type["cd"]
-            doc.cdnm = taxation_type["cdNm"]
-            doc.cddesc = taxation_type["cdDesc"]
-            doc.useyn = 1 if taxation_type["useYn"] == "Y" else 0
-            doc.srtord = taxation_type["srtOrd"]
-            doc.userdfncd1 = taxation_type["userDfnCd1"]
-            doc.userdfncd2 = taxation_type["userDfnCd2"]
-            doc.userdfncd3 = taxation_type["userDfnCd3"]
+def update_unit_of_quantity(data: dict) -> None:
+    bulk_upsert(
+        UNIT_OF_QUANTITY_DOCTYPE_NAME,
+        [
+            {
+                "name": unit_of_quantity["cd"],
+                "code": unit_of_quantity["cd"],
+                "sort_order": unit_of_quantity["srtOrd"],
+                "code_name": unit_of_quantity["cdNm"],
+                "code_description": unit_of_quantity["cdDesc"],
+            }
+            for unit_of_quantity in data["dtlList"]
+        ],
+    )
 
-            doc.save()
 
-    frappe.db.commit()
+def update_taxation_type(data: dict) -> None:
+    bulk_upsert(
+        TAXATION_TYPE_DOCTYPE_NAME,
+        [
+            {
+                "name": taxation_type["cd"],
+                "cd": taxation_type["cd"],
+                "cdnm": taxation_type["cdNm"],
+                "cddesc": taxation_type["cdDesc"],
+                "useyn": 1 if taxation_type["useYn"] == "Y" else 0,
+                "srtord": taxation_type["srtOrd"],
+                "userdfncd1": taxation_type["userDfnCd1"],
+                "userdfncd2": taxation_type["userDfnCd2"],
+                "userdfncd3": taxation_type["userDfnCd3"],
+            }
+            for taxation_type in data["dtlList"]
+        ],
+    )
 
 
 def update_packaging_units(data: dict) -> None:
-    doc: Document | None = None
-
-    for packaging_unit in data["dtlList"]:
-        try:
-            doc = frappe.get_doc(PACKAGING_UNIT_DOCTYPE_NAME, packaging_unit["cd"])
-
-        except frappe.DoesNotExistError:
-            doc = frappe.new_doc(PACKAGING_UNIT_DOCTYPE_NAME)
-
-        finally:
-            doc.code = packaging_unit["cd"]
-            doc.code_name = packaging_unit["cdNm"]
-            doc.sort_order = packaging_unit["srtOrd"]
-            doc.code_description = packaging_unit["cdDesc"]
-
-            doc.save()
-
-    frappe.db.commit()
+    bulk_upsert(
+        PACKAGING_UNIT_DOCTYPE_NAME,
+        [
+            {
+                "name": packaging_unit["cd"],
+                "code": packaging_unit["cd"],
+                "code_name": packaging_unit["cdNm"],
+                "sort_order": packaging_unit["srtOrd"],
+                "code_description": packaging_unit["cdDesc"],
+            }
+            for packaging_unit in data["dtlList"]
+        ],
+    )
 
 
 def update_countries(data: dict) -> None:
-    doc: Document | None = None
-
-    for country in data["dtlList"]:
-        try:
-            doc = frappe.get_doc(COUNTRIES_DOCTYPE_NAME, country["cdNm"])
-
-        except frappe.DoesNotExistError:
-            doc = frappe.new_doc(COUNTRIES_DOCTYPE_NAME)
-
-        finally:
-            doc.code = country["cd"]
-            doc.code_name = country["cdNm"]
-            doc.sort_order = country["srtOrd"]
-            doc.code_description = country["cdDesc"]
-
-            doc.save()
-
-    frappe.db.commit()
+    # Countries are named by their name rather than their code
+    bulk_upsert(
+        COUNTRIES_DOCTYPE_NAME,
+        [
+            {
+                "name": country["cdNm"],
+                "code": country["cd"],
+                "code_name": country["cdNm"],
+                "sort_order": country["srtOrd"],
+                "code_description": country["cdDesc"],
+            }
+            for country in data["dtlList"]
+        ],
+    )
 
 
 def update_item_classification_codes(response: dict) -> None:
-    code_list = response["data"]["itemClsList"]
-    existing_classifications = {
-        classification["name"]: classification
-        for classification in frappe.get_all(ITEM_CLASSIFICATIONS_DOCTYPE_NAME, ["*"])
-    }
-
-    for item_classification in code_list:
-        if item_classification["itemClsCd"] in existing_classifications:
-            # Prefer Raw SQL since using the ORM causes performance degradation. Still under investigation
-            update_query = f"""
-                UPDATE `tab{ITEM_CLASSIFICATIONS_DOCTYPE_NAME}`
-                SET itemclscd = '{item_classification["itemClsCd"]}',
-                    itemclslvl = '{item_classification["itemClsLvl"]}',
-                    itemclsnm = '{item_classification["itemClsNm"].replace("'", " ")}',
-                    taxtycd = '{item_classification["taxTyCd"]}',
-                    useyn = '{1 if item_classification["useYn"] == "Y" else 0}',
-                    mjrtgyn  = '{1 if item_classification["mjrTgYn"] == "Y" else 0}',
-                    modified = SYSDATE()
-                WHERE name = '{item_classification["itemClsCd"]}';
-            """
-
-            frappe.db.sql(update_query)
-
-        else:
-            insert_query = f"""
-                INSERT INTO `tab{ITEM_CLASSIFICATIONS_DOCTYPE_NAME}`
-                    (name, itemclscd, itemclslvl, itemclsnm, taxtycd, useyn, mjrtgyn, creation)
-                VALUES
-                    ('{item_classification["itemClsCd"]}',
-                     '{item_classification["itemClsCd"]}',
-                     '{item_classification["itemClsLvl"]}',
-                     '{item_classification["itemClsNm"].replace("'", " ")}',
-                     '{item_classification["taxTyCd"]}',
-                     '{1 if item_classification["useYn"] == "Y" else 0}',
-                     '{1 if item_classification["mjrTgYn"] == "Y" else 0}',
-                     SYSDATE());
-            """
-
-            frappe.db.sql(insert_query)
+    bulk_upsert(
+        ITEM_CLASSIFICATIONS_DOCTYPE_NAME,
+        [
+            {
+                "name": item_classification["itemClsCd"],
+                "itemclscd": item_classification["itemClsCd"],
+                "itemclslvl": item_classification["itemClsLvl"],
+                "itemclsnm": item_classification["itemClsNm"],
+                "taxtycd": item_classification["taxTyCd"],
+                "useyn": 1 if item_classification["useYn"] == "Y" else 0,
+                "mjrtgyn": 1 if item_classification["mjrTgYn"] == "Y" else 0,
+            }
+            for item_classification in response["data"]["itemClsList"]
+        ],
+    )
 
     frappe.db.commit()
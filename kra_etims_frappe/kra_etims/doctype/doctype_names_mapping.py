@@ -1,39 +1,62 @@
 """Maps doctype names defined and used in the app to variable names"""
 
+from dataclasses import dataclass
 from typing import Final
 
-# Doctypes
-SETTINGS_DOCTYPE_NAME: Final[str] = "eTims Settings"
-ITEM_CLASSIFICATIONS_DOCTYPE_NAME: Final[str] = "eTims Item Classification"
-TAXATION_TYPE_DOCTYPE_NAME: Final[str] = "eTims Taxation Type"
-PAYMENT_TYPE_DOCTYPE_NAME: Final[str] = "eTims Payment Type"
-TRANSACTION_PROGRESS_DOCTYPE_NAME: Final[str] = "eTims Transaction Progress"
-PACKAGING_UNIT_DOCTYPE_NAME: Final[str] = "eTims Packaging Unit"
-UNIT_OF_QUANTITY_DOCTYPE_NAME: Final[str] = "eTims Unit of Quantity"
-ENVIRONMENT_SPECIFICATION_DOCTYPE_NAME: Final[str] = (
-    "eTims Environment Identifier"
-)
-INTEGRATION_LOGS_DOCTYPE_NAME: Final[str] = "eTims Integration Log"
-STOCK_MOVEMENT_TYPE_DOCTYPE_NAME: Final[str] = "eTims Stock Movement Type"
-PRODUCT_TYPE_DOCTYPE_NAME: Final[str] = "eTims Product Type"
-COUNTRIES_DOCTYPE_NAME: Final[str] = "eTims Country"
-IMPORTED_ITEMS_STATUS_DOCTYPE_NAME: Final[str] = "eTims Import Item Status"
-PURCHASE_RECEIPT_DOCTYPE_NAME: Final[str] = "eTims Purchase Receipt Type"
-TRANSACTION_TYPE_DOCTYPE_NAME: Final[str] = "eTims Transaction Type"
-REGISTERED_PURCHASES_DOCTYPE_NAME: Final[str] = "eTims Registered Purchases"
-REGISTERED_PURCHASES_DOCTYPE_NAME_ITEM: Final[str] = (
-    "eTims Registered Purchases Items"
-)
-NOTICES_DOCTYPE_NAME: Final[str] = "eTims Notices"
-USER_DOCTYPE_NAME: Final[str] = "eTims User"
-REGISTERED_STOCK_MOVEMENTS_DOCTYPE_NAME: Final[str] = (
-    "eTims Registered Stock Movement"
-)
-REGISTERED_STOCK_MOVEMENTS_ITEM_DOCTYPE_NAME: Final[str] = (
-    "eTims Registered Stock Movement Item"
-)
-REGISTERED_IMPORTED_ITEM_DOCTYPE_NAME: Final[str] = (
-    "eTims Registered Imported Item"
-)
-
-ROUTES_URL_FUNCTION_DOCTYPE_NAME: Final[str]  = ("eTims URL Path Function")
+
+@dataclass(frozen=True, slots=True)
+class DoctypeNames:
+    """The app's doctype names, grouped in one immutable namespace"""
+
+    SETTINGS: str = "eTims Settings"
+    ITEM_CLASSIFICATIONS: str = "eTims Item Classification"
+    TAXATION_TYPE: str = "eTims Taxation Type"
+    PAYMENT_TYPE: str = "eTims Payment Type"
+    TRANSACTION_PROGRESS: str = "eTims Transaction Progress"
+    PACKAGING_UNIT: str = "eTims Packaging Unit"
+    UNIT_OF_QUANTITY: str = "eTims Unit of Quantity"
+    ENVIRONMENT_SPECIFICATION: str = "eTims Environment Identifier"
+    INTEGRATION_LOGS: str = "eTims Integration Log"
+    STOCK_MOVEMENT_TYPE: str = "eTims Stock Movement Type"
+    PRODUCT_TYPE: str = "eTims Product Type"
+    COUNTRIES: str = "eTims Country"
+    IMPORTED_ITEMS_STATUS: str = "eTims Import Item Status"
+    PURCHASE_RECEIPT: str = "eTims Purchase Receipt Type"
+    TRANSACTION_TYPE: str = "eTims Transaction Type"
+    REGISTERED_PURCHASES: str = "eTims Registered Purchases"
+    REGISTERED_PURCHASES_ITEM: str = "eTims Registered Purchases Items"
+    NOTICES: str = "eTims Notices"
+    USER: str = "eTims User"
+    REGISTERED_STOCK_MOVEMENTS: str = "eTims Registered Stock Movement"
+    REGISTERED_STOCK_MOVEMENTS_ITEM: str = "eTims Registered Stock Movement Item"
+    REGISTERED_IMPORTED_ITEM: str = "eTims Registered Imported Item"
+    ROUTES_URL_FUNCTION: str = "eTims URL Path Function"
+
+
+DT: Final[DoctypeNames] = DoctypeNames()
+
+# Doctypes; the module-level names the rest of the app imports
+SETTINGS_DOCTYPE_NAME: Final[str] = DT.SETTINGS
+ITEM_CLASSIFICATIONS_DOCTYPE_NAME: Final[str] = DT.ITEM_CLASSIFICATIONS
+TAXATION_TYPE_DOCTYPE_NAME: Final[str] = DT.TAXATION_TYPE
+PAYMENT_TYPE_DOCTYPE_NAME: Final[str] = DT.PAYMENT_TYPE
+TRANSACTION_PROGRESS_DOCTYPE_NAME: Final[str] = DT.TRANSACTION_PROGRESS
+PACKAGING_UNIT_DOCTYPE_NAME: Final[str] = DT.PACKAGING_UNIT
+UNIT_OF_QUANTITY_DOCTYPE_NAME: Final[str] = DT.UNIT_OF_QUANTITY
+ENVIRONMENT_SPECIFICATION_DOCTYPE_NAME: Final[str] = DT.ENVIRONMENT_SPECIFICATION
+INTEGRATION_LOGS_DOCTYPE_NAME: Final[str] = DT.INTEGRATION_LOGS
+STOCK_MOVEMENT_TYPE_DOCTYPE_NAME: Final[str] = DT.STOCK_MOVEMENT_TYPE
+PRODUCT_TYPE_DOCTYPE_NAME: Final[str] = DT.PRODUCT_TYPE
+COUNTRIES_DOCTYPE_NAME: Final[str] = DT.COUNTRIES
+IMPORTED_ITEMS_STATUS_DOCTYPE_NAME: Final[str] = DT.IMPORTED_ITEMS_STATUS
+PURCHASE_RECEIPT_DOCTYPE_NAME: Final[str] = DT.PURCHASE_RECEIPT
+TRANSACTION_TYPE_DOCTYPE_NAME: Final[str] = DT.TRANSACTION_TYPE
+REGISTERED_PURCHASES_DOCTYPE_NAME: Final[str] = DT.REGISTERED_PURCHASES
+REGISTERED_PURCHASES_DOCTYPE_NAME_ITEM: Final[str] = DT.REGISTERED_PURCHASES_ITEM
+NOTICES_DOCTYPE_NAME: Final[str] = DT.NOTICES
+USER_DOCTYPE_NAME: Final[str] = DT.USER
+REGISTERED_STOCK_MOVEMENTS_DOCTYPE_NAME: Final[str] = DT.REGISTERED_STOCK_MOVEMENTS
+REGISTERED_STOCK_MOVEMENTS_ITEM_DOCTYPE_NAME: Final[str] = DT.REGISTERED_STOCK_MOVEMENTS_ITEM
+REGISTERED_IMPORTED_ITEM_DOCTYPE_NAME: Final[str] = DT.REGISTERED_IMPORTED_ITEM
+
+ROUTES_URL_FUNCTION_DOCTYPE_NAME: Final[str] = DT.ROUTES_URL_FUNCTION
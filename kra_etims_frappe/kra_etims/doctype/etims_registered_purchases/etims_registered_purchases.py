@@ -13,20 +13,28 @@ def validate_item_mapped_and_registered(items):
     but they have different item classification'''
     try:
         items = json.loads(items)
+        item_names = list({item.get("item_name") for item in items if item.get("item_name")})
 
-        for item in items:            
-            similar_items = frappe.get_all(
+        # One query for every candidate; matching on name, code and taxation
+        # type happens in Python (case-insensitively, like the DB collation)
+        mapped_items = {
+            (
+                (row.item_name or "").casefold(),
+                (row.item_code or "").casefold(),
+                (row.custom_taxation_type or "").casefold(),
+            )
+            for row in frappe.db.get_values(
                 "Item",
-                filters={
-                    "item_name": item.get("item_name"),
-                    "item_code": item.get("item_name"),
-                    #"custom_item_classification": item.get("item_classification_code"),
-                    #"custom_item_code_etims":item.get("item_code"),
-                    "custom_taxation_type": item.get("taxation_type_code"),
-                },
-                fields=["name", "item_name", "item_code"],
+                {"item_code": ["in", item_names]},
+                ["item_name", "item_code", "custom_taxation_type"],
+                as_dict=True,
             )
-            if not similar_items:
+        } if item_names else set()
+
+        for item in items:
+            item_name = (item.get("item_name") or "").casefold()
+            taxation_type = (item.get("taxation_type_code") or "").casefold()
+            if (item_name, item_name, taxation_type) not in mapped_items:
                 frappe.response["message"] = False
                 return
 
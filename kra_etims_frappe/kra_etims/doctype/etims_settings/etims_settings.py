@@ -8,6 +8,7 @@ from kra_etims_sdk.client import EtimsClient
 from kra_etims_sdk.exceptions import ApiException, AuthenticationException
 
 # Local imports
+from ...apis.apis import EtimsSDKWrapper
 from ...doctype.doctype_names_mapping import (
     SETTINGS_DOCTYPE_NAME,
 )
@@ -328,6 +329,12 @@ class eTimsSettings(Document):
         if self.autocreate_branch_dimension and self.is_active:
             self._create_branch_dimension()
 
+        # Credentials may have changed, so rebuild SDK clients on next use
+        EtimsSDKWrapper.clear_client_cache()
+
+    def on_trash(self) -> None:
+        EtimsSDKWrapper.clear_client_cache()
+
     def _update_scheduled_job_frequency(self, method_name: str, frequency: str | None, cron_format: str | None = None) -> None:
         """Helper to update scheduled job frequency and cron format safely"""
         if not frequency:
@@ -3,6 +3,7 @@ import frappe
 from frappe.model.delete_doc import delete_doc
 from frappe.model.document import Document
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
 
 from ..doctype_names_mapping import (
     SETTINGS_DOCTYPE_NAME,
@@ -35,45 +36,58 @@ def mock_before_insert_2(self, *args) -> None:
         dimension.save()
 
 
-def create_test_company():
-    frappe.delete_doc_if_exists(
-        "Company",
-        {"abbr": "CTC", "company_name": "Test Company"},
-        force=1,
-    )
-    company = frappe.new_doc("Company")
-
-    company.company_name = "Test Company"
-    company.abbr = "CTC"
-    company.default_currency = "USD"
-    company.country = "Kenya"
-    company.tax_id = "A123456789Z"
+TEST_COMPANY_FIELDS = (
+    "name",
+    "company_name",
+    "abbr",
+    "default_currency",
+    "country",
+    "tax_id",
+)
+TEST_COMPANIES = (
+    ("Test Company", "Test Company", "CTC", "USD", "Kenya", "A123456789Z"),
+    ("Test Company 2", "Test Company 2", "CTC2", "USD", "Kenya", "A1234567890Z"),
+)
 
-    company.save()
 
-    frappe.delete_doc_if_exists(
-        "Company",
-        {"abbr": "CTC2", "company_name": "Test Company 2"},
-        force=1,
+def delete_test_companies():
+    """Remove the test companies and their accounts without going through
+    delete_doc, whose link checks are wasted on records nothing links to"""
+    abbrs = tuple(company[2] for company in TEST_COMPANIES)
+    frappe.db.sql(
+        """
+        DELETE FROM `tabAccount`
+        WHERE company IN (SELECT name FROM `tabCompany` WHERE abbr IN %s)
+        """,
+        (abbrs,),
     )
-    company = frappe.new_doc("Company")
-
-    company.company_name = "Test Company 2"
-    company.abbr = "CTC2"
-    company.default_currency = "USD"
-    company.country = "Kenya"
-    company.tax_id = "A1234567890Z"
-
-    company.save()
+    frappe.db.sql("DELETE FROM `tabCompany` WHERE abbr IN %s", (abbrs,))
 
 
-def create_test_branch(branch_name: str | None):
-    branch = frappe.new_doc("Branch")
+def create_test_company():
+    delete_test_companies()
+
+    # The settings tests only need the Company rows to exist, so skip the
+    # controller (chart of accounts, defaults) and insert both in one go.
+    # lft/rgt are left unset: nothing in these tests walks the company tree
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        "Company",
+        fields=(*TEST_COMPANY_FIELDS, "creation", "modified", "owner", "modified_by"),
+        values=[(*company, now, now, user, user) for company in TEST_COMPANIES],
+        ignore_duplicates=True,
+    )
 
-    branch.branch = branch_name or "100"
-    branch.custom_branch_code = branch_name or "100"
 
-    branch.save()
+def create_test_branches(branch_names: list[str]):
+    """Insert all test branches in a single multi-row INSERT"""
+    frappe.db.bulk_insert(
+        "Branch",
+        fields=("name", "branch", "custom_branch_code"),
+        values=[(name, name, name) for name in branch_names],
+        ignore_duplicates=True,
+    )
 
 
 class TesteTimsSettings(FrappeTestCase):
@@ -88,15 +102,15 @@ class TesteTimsSettings(FrappeTestCase):
 
     def setUp(self) -> None:
         create_test_company()
-        create_test_branch(None)
-        create_test_branch("0")
-        create_test_branch("failing test branch")
+        branch_names = ["100", "0", "failing test branch"]
 
         # Delete branch 00 iff it was created in the test
         if not frappe.db.exists("Branch", {"custom_branch_code": "00"}):
-            create_test_branch("00")
+            branch_names.append("00")
             self.delete_hq_branch = True
 
+        create_test_branches(branch_names)
+
         if not frappe.db.exists("Accounting Dimension", "Branch", cache=False):
             self.delete_branch_acct_dim = True
 
@@ -109,59 +123,42 @@ class TesteTimsSettings(FrappeTestCase):
         self.addCleanup(self.patcher.stop)
 
     def tearDown(self) -> None:
+        # Undo exactly what setUp and the test wrote, in the same transaction,
+        # so there is nothing left over to commit
         # 1. Delete dependent Settings first
-        settings = frappe.get_all(
-            SETTINGS_DOCTYPE_NAME,
-            filters={"company": ["like", "%Test Company%"]},
-            pluck="name",
+        frappe.db.delete(
+            SETTINGS_DOCTYPE_NAME, {"company": ["like", "%Test Company%"]}
         )
-        for s in settings:
-            frappe.delete_doc(SETTINGS_DOCTYPE_NAME, s, force=1, ignore_permissions=True)
 
         # 2. Delete Branches
-        for branch_name in ["100", "0", "failing test branch", "00"]:
-            if frappe.db.exists("Branch", branch_name):
-                frappe.delete_doc("Branch", branch_name, force=1, ignore_permissions=True)
+        frappe.db.delete(
+            "Branch", {"name": ["in", ["100", "0", "failing test branch", "00"]]}
+        )
 
         # 3. Delete Accounting Dimension if requested
         if self.delete_branch_acct_dim and frappe.db.exists("Accounting Dimension", "Branch"):
             frappe.delete_doc("Accounting Dimension", "Branch", force=1, ignore_permissions=True)
 
         # 4. Delete Companies
-        for abbr, name in [
-            ("CTC", "Test Company"),
-            ("CTC2", "Test Company 2"),
-        ]:
-            comp_name = frappe.get_value("Company", {"abbr": abbr, "company_name": name})
-            if comp_name:
-                frappe.delete_doc("Company", comp_name, force=1, ignore_permissions=True)
-
-        frappe.db.commit()
+        delete_test_companies()
 
 
     def test_invalid_branch_id(self) -> None:
-        with self.assertRaises(frappe.ValidationError):
-            new_setting = frappe.new_doc(SETTINGS_DOCTYPE_NAME)
-
-            new_setting.bhfid = "100"
-            new_setting.company = "Test Company"
-            new_setting.tin = "A123456789Z"
-            new_setting.dvcsrlno = "123456"
-            new_setting.consumer_key = ""
-            new_setting.consumer_secret = ""
-            new_setting.vendor = "Test Vendor"
-
-            new_setting.save()
-
-            new_setting.bhfid = "0"
-            new_setting.vendor = "Test Vendor"
-
-            new_setting.save()
-
-            new_setting.bhfid = "failing test branch"
-            new_setting.vendor = "Test Vendor"
-
-            new_setting.save()
+        for invalid_branch_id in ("100", "0", "failing test branch"):
+            with self.subTest(bhfid=invalid_branch_id), self.assertRaises(
+                frappe.ValidationError
+            ):
+                new_setting = frappe.new_doc(SETTINGS_DOCTYPE_NAME)
+
+                new_setting.bhfid = invalid_branch_id
+                new_setting.company = "Test Company"
+                new_setting.tin = "A123456789Z"
+                new_setting.dvcsrlno = "123456"
+                new_setting.consumer_key = ""
+                new_setting.consumer_secret = ""
+                new_setting.vendor = "Test Vendor"
+
+                new_setting.save()
 
         self.assertIsNone(
             frappe.db.exists(
@@ -224,12 +221,12 @@ class TesteTimsSettings(FrappeTestCase):
         new_setting_2.vendor = "OSCU KRA"  
         new_setting_2.save()
 
-        all_active_envs = frappe.get_all(
+        active_envs_count = frappe.db.count(
             SETTINGS_DOCTYPE_NAME,
             {"company": "Test Company", "is_active": 1},
         )
 
-        self.assertEqual(len(all_active_envs), 1)
+        self.assertEqual(active_envs_count, 1)
 
     def test_incorrect_cron_formats(self) -> None:
         with self.assertRaises(frappe.ValidationError):
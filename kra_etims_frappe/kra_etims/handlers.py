@@ -1,5 +1,7 @@
+import logging
+import traceback
+
 import frappe
-from frappe.model.document import Document
 
 from .logger import etims_logger
 
@@ -7,24 +9,31 @@ def handle_errors(
     response: dict[str, str],
     route: str,
     document_name: str,
-    doctype: str | Document | None = None,
+    doctype: str | None = None,
     integration_request_name: str | None = None,
 ) -> None:
     
-    etims_logger.error("%s" % (response))
+    if not etims_logger.isEnabledFor(logging.ERROR):
+        # Logging is suppressed here, so skip formatting and the Error Log insert
+        raise frappe.InvalidStatusError(response)
+
+    etims_logger.error("%s", response)
 
-    try:
-        frappe.throw(
-            response,
-            frappe.InvalidStatusError,
-            title=f"Error",
-        )
+    # Log against the caller's stack directly instead of raising, catching and
+    # re-walking the frames through frappe.get_traceback
+    error = frappe.InvalidStatusError(response)
+    frappe.log_error(
+        title=str(error)[:140],
+        message="".join(
+            traceback.format_stack()[:-1]
+            + traceback.format_exception_only(type(error), error)
+        ),
+        reference_name=document_name,
+        reference_doctype=doctype,
+    )
 
-    except frappe.InvalidStatusError as error:
-        frappe.log_error(
-            frappe.get_traceback(with_context=True),
-            error,
-            reference_name=document_name,
-            reference_doctype=doctype,
-        )
-        raise
+    frappe.throw(
+        response,
+        frappe.InvalidStatusError,
+        title=f"Error",
+    )
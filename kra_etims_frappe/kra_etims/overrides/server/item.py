@@ -41,14 +41,14 @@ def validate(doc: Document, method: str) -> None:
     if doc.custom_taxation_type and is_tax_type_changed:
         relevant_tax_templates = frappe.get_all(
             "Item Tax Template",
-            ["*"],
             {"custom_etims_taxation_type": doc.custom_taxation_type},
+            pluck="name",
         )
 
         if relevant_tax_templates:
             doc.set("taxes", [])
             for template in relevant_tax_templates:
-                doc.append("taxes", {"item_tax_template": template.name})
+                doc.append("taxes", {"item_tax_template": template})
 
 @frappe.whitelist()
 def prevent_item_deletion(doc, method):
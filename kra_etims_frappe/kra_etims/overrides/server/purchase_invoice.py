@@ -1,11 +1,11 @@
-from collections import defaultdict
+from contextlib import contextmanager
 from functools import partial
-import json
+from types import MappingProxyType
+from typing import Iterator
 import frappe
 from frappe.model.document import Document
-from erpnext.controllers.taxes_and_totals import get_itemised_tax_breakup_data
-from frappe.utils import get_link_to_form 
-from frappe.integrations.utils import create_request_log
+from frappe.utils import get_link_to_form, getdate
+from frappe.utils.caching import request_cache
 
 from ...apis.remote_response_status_handlers import (
 	on_error,
@@ -18,31 +18,42 @@ from ...utils import (
 	get_taxation_types
 )
 
-from ...apis.apis import  (
-    EtimsSDKWrapper,
-    update_integration_request_status
-)
+# eTIMS taxation type codes, in payload order
+TAX_CODES = ("A", "B", "C", "D", "E")
+EMPTY_TAX_ROW = MappingProxyType({})
+
+# Filters selecting the purchase invoices still to be sent to eTIMS
+PENDING_PURCHASE_FILTERS = MappingProxyType({
+    "docstatus": 1,
+    "custom_submitted_successfully": 0,
+    "is_return": 0,
+    "update_stock": 1,
+})
+
+# Set while a flush job for a company branch waits in the queue; the job
+# clears it as it starts. Bounded so a lost job can't block flushes for good
+PURCHASE_FLUSH_QUEUED_KEY = "etims:purchase_flush_queued:{company}:{branch}"
+PURCHASE_FLUSH_QUEUED_TTL = 600
+
+# Held while one flush sends an invoice, so overlapping flushes don't both send it
+PURCHASE_SEND_LOCK_KEY = "etims:purchase_send_lock:{invoice}"
+PURCHASE_SEND_LOCK_TTL = 300
 
 
 def validate(doc: Document, method: str) -> None:
 	if not doc.branch:
 		frappe.throw("Please ensure the branch is set before saving the document")
-	item_taxes = get_itemised_tax_breakup_data(doc)
 	# if not doc.branch:
 	#     frappe.throw("Please ensure the branch is set before submitting the document")
-	taxes_breakdown = defaultdict(list)
-	taxable_breakdown = defaultdict(list)
 	if not doc.taxes:
-		vat_acct = frappe.get_value(
-			"Account", {"account_type": "Tax", "tax_rate": "16"}, ["name"], as_dict=True
-		)
+		vat_account, vat_description = get_vat_account(doc.company)
 		doc.set(
 			"taxes",
 			[
 				{
-					"account_head": vat_acct.name,
+					"account_head": vat_account,
 					"included_in_print_rate": 1,
-					"description": vat_acct.name.split("-", 1)[0].strip(),
+					"description": vat_description,
 					"category": "Total",
 					"add_deduct_tax": "Add",
 					"charge_type": "On Net Total",
@@ -51,130 +62,234 @@ def validate(doc: Document, method: str) -> None:
 		)
 
 
+@request_cache
+def get_vat_account(company: str) -> tuple[str, str]:
+	"""Return the company's 16% VAT account and its description, once per request"""
+	vat_acct = frappe.db.get_value(
+		"Account", {"account_type": "Tax", "tax_rate": "16", "company": company}, "name"
+	)
+
+	return vat_acct, vat_acct.split("-", 1)[0].strip()
+
 
 def on_submit(doc: Document, method: str | None = None) -> None:
     """Submit purchase invoice to eTIMS when document is submitted"""
+    # Only process non-return invoices with stock updates
+    if doc.is_return or not doc.update_stock:
+        return
+
     # Validate all items are registered before proceeding
     validate_item_registration(doc.items)
-    
-    # Only process non-return invoices with stock updates
-    if doc.is_return == 0 and doc.update_stock == 1:
-        company_name = doc.company
-        vendor = "OSCU KRA"
-        branch_id = doc.branch or "00"
-        
-        def _submit_purchase_transaction():
-            try:
-                # Get SDK client with branch-specific configuration
-                client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-                
-                # Create integration request BEFORE API call for audit trail
-                integration_request = create_request_log(
-                    data={"invoice_no": doc.name, "supplier": doc.supplier},
-                    is_remote_request=True,
-                    service_name="eTIMS",
-                    request_headers={},
-                    url=f"SDK:{client.config['env']}:save_purchase_transaction",
-                    reference_docname=doc.name,
-                    reference_doctype="Purchase Invoice",
-                )
-                
-                # Build payload using existing helper function
-                payload = build_purchase_invoice_payload(doc)
-                
-                # Submit to eTIMS via SDK
-                response = client.save_purchase(payload)
-                
-                if response.get("resultCd") == "000":
-                    update_integration_request_status(
-                        integration_request.name,
-                        status="Completed",
-                        output=json.dumps(response),
-                        error=None
-                    )
-                    
-                    # Call success handler
-                    purchase_invoice_submission_on_success(
-                        response,
-                        document_name=doc.name
-                    )
-                                        
-                    frappe.msgprint(
-                        f"✅ Purchase Invoice {doc.name} submitted successfully to eTIMS",
-                        indicator="green"
-                    )
-                else:
-                    update_integration_request_status(
-                        integration_request.name,
-                        status="Failed",
-                        output=None,
-                        error=response.get("resultMsg", "Unknown error")
-                    )
-                    on_error(
-                        response.get("resultMsg", "Unknown error"),
-                        url="/TrnsPurchaseSaveReq",
-                        doctype="Purchase Invoice",
-                        document_name=doc.name,
-                    )
-                    frappe.log_error(
-                        title="eTIMS Purchase Invoice Submission Failed",
-                        message=f"Invoice: {doc.name}, Supplier: {doc.supplier}, Error: {response.get('resultMsg', 'Unknown')}"
-                    )
-                    frappe.msgprint(
-                        f"❌ Purchase invoice submission failed. Check Error Log.",
-                        indicator="red"
-                    )
-                    
-            except Exception as e:
-                # Handle integration request cleanup if created
-                if 'integration_request' in locals():
-                    update_integration_request_status(
-                        integration_request.name,
-                        status="Failed",
-                        output=None,
-                        error=str(e)
-                    )
-                on_error(str(e), url="/TrnsPurchaseSaveReq", doctype="Purchase Invoice", document_name=doc.name)
-                frappe.log_error(
-                    title="eTIMS Purchase Invoice Submission Error",
-                    message=f"Invoice: {doc.name}, Supplier: {doc.supplier}, Error: {str(e)}"
-                )
-                frappe.msgprint(
-                    f"❌ Purchase invoice submission encountered an error. Check Error Log.",
-                    indicator="red"
-                )
-        
-        # Enqueue async processing to avoid blocking UI
+
+    frappe.db.after_commit.add(partial(queue_purchase_flush, doc.company, doc.branch))
+
+
+def queue_purchase_flush(company_name: str, branch_id: str) -> None:
+    """Queue a flush of the branch's pending invoices unless one is already waiting.
+
+    Only a queued job absorbs the enqueue: the job clears the flag as it
+    starts, so an invoice submitted while it runs queues the next flush
+    rather than waiting for the scheduled resend.
+    """
+    cache = frappe.cache()
+    flag = cache.make_key(PURCHASE_FLUSH_QUEUED_KEY.format(company=company_name, branch=branch_id))
+    if cache.set(flag, 1, ex=PURCHASE_FLUSH_QUEUED_TTL, nx=True):
         frappe.enqueue(
-            _submit_purchase_transaction,
+            flush_pending_purchase_invoices,
             is_async=True,
             queue="default",
-            timeout=300,
-            job_name=f"{doc.name}_send_purchase_information",
+            timeout=1800,
+            job_name=f"{company_name}_{branch_id}_send_purchase_information",
+            company_name=company_name,
+            branch_id=branch_id,
         )
 
 
-def validate_item_registration(items) -> None:
-    """Validate all items in the document are registered in eTIMS"""
-    unregistered_items = []
-    
-    for item in items:
-        item_doc = frappe.get_doc("Item", item.item_code)
-        if not item_doc.custom_item_registered:
-            unregistered_items.append(item.item_code)
-    
-    if unregistered_items:
-        frappe.throw(
-            f"""The following items are not registered in eTIMS:<br><br>
-            <b>{', '.join(unregistered_items)}</b><br><br>
-            Please register all items before submitting this document.""",
-            title="Item Registration Required"
+def flush_pending_purchase_invoices(company_name: str, branch_id: str) -> None:
+    """Submit every pending purchase invoice of a company branch to eTIMS.
+
+    The pending invoices are read from the database rather than a queue of
+    their own, so nothing is lost with the job and an invoice already sent is
+    never sent again. The query is repeated until it turns up nothing new,
+    picking up invoices submitted while the job ran.
+    """
+    frappe.cache().delete_value(PURCHASE_FLUSH_QUEUED_KEY.format(company=company_name, branch=branch_id))
+
+    filters = {**PENDING_PURCHASE_FILTERS, "company": company_name, "branch": branch_id}
+    attempted: set[str] = set()
+
+    while names := [
+        name
+        for name in frappe.get_all("Purchase Invoice", filters, pluck="name", order_by="creation asc")
+        if name not in attempted
+    ]:
+        for invoice_name in names:
+            attempted.add(invoice_name)
+            with claim_purchase_invoice(invoice_name) as claimed:
+                # An overlapping flush is sending it already
+                if claimed:
+                    send_pending_purchase_invoice(invoice_name)
+
+
+@contextmanager
+def claim_purchase_invoice(invoice_name: str) -> Iterator[bool]:
+    """Claim an invoice for sending; yields False if another flush holds it"""
+    cache = frappe.cache()
+    key = PURCHASE_SEND_LOCK_KEY.format(invoice=invoice_name)
+    claimed = cache.set(cache.make_key(key), 1, ex=PURCHASE_SEND_LOCK_TTL, nx=True)
+
+    try:
+        yield bool(claimed)
+    finally:
+        if claimed:
+            cache.delete_value(key)
+
+
+def send_pending_purchase_invoice(invoice_name: str) -> None:
+    """Send one pending invoice and commit its outcome before the next"""
+    try:
+        # Re-read under the claim; a flush that just let go of it has sent it
+        doc = frappe.get_doc("Purchase Invoice", invoice_name)
+        if doc.docstatus != 1 or doc.custom_submitted_successfully:
+            return
+
+        try:
+            validate_item_registration(doc.items)
+        except frappe.ValidationError:
+            # Held back until its items are registered; the scheduled resend retries it
+            frappe.log_error(
+                title="eTIMS Purchase Invoice Not Sent: Unregistered Items",
+                reference_doctype="Purchase Invoice",
+                reference_name=invoice_name,
+            )
+            return
+
+        submit_purchase_invoice(doc)
+
+    except frappe.InvalidStatusError:
+        # Logged and recorded against the invoice by on_error; keep that
+        pass
+
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            title="eTIMS Purchase Invoice Submission Error",
+            reference_doctype="Purchase Invoice",
+            reference_name=invoice_name,
         )
 
+    finally:
+        frappe.db.commit()
+
+
+def submit_purchase_invoice(doc: Document, vendor: str = "OSCU KRA") -> None:
+    # Imported here so validate-only paths don't load the SDK
+    from ...apis.apis import (
+        EtimsSDKWrapper,
+        dump_response,
+        insert_integration_request,
+        update_integration_request_status,
+    )
+
+    log_data = {"invoice_no": doc.name, "supplier": doc.supplier}
+    url = None
+    integration_request = None
+    try:
+        # Get SDK client with branch-specific configuration
+        client = EtimsSDKWrapper.get_client(doc.company, vendor, doc.branch or "00")
+        url = f"SDK:{client.config['env']}:save_purchase_transaction"
+        
+        # Build payload using existing helper function
+        payload = build_purchase_invoice_payload(doc)
+        
+        # Submit to eTIMS via SDK
+        response = client.save_purchase(payload)
+        
+        # Write the audit row once, with the outcome
+        if response.get("resultCd") == "000":
+            integration_request = insert_integration_request(
+                data=log_data,
+                url=url,
+                reference_doctype="Purchase Invoice",
+                reference_docname=doc.name,
+                status="Completed",
+                output=dump_response(response),
+            )
+            
+            # Call success handler
+            purchase_invoice_submission_on_success(
+                response,
+                document_name=doc.name
+            )
+                                
+            if frappe.request:
+                frappe.msgprint(
+                    f"✅ Purchase Invoice {doc.name} submitted successfully to eTIMS",
+                    indicator="green"
+                )
+        else:
+            error = response.get("resultMsg", "Unknown error")
+            integration_request = insert_integration_request(
+                data=log_data,
+                url=url,
+                reference_doctype="Purchase Invoice",
+                reference_docname=doc.name,
+                status="Failed",
+                error=error,
+            )
+            # on_error writes the Error Log and notifies the user
+            on_error(
+                f"Invoice: {doc.name}, Supplier: {doc.supplier}, Error: {error}",
+                url="/TrnsPurchaseSaveReq",
+                doctype="Purchase Invoice",
+                document_name=doc.name,
+            )
+
+    except frappe.InvalidStatusError:
+        # Already logged and recorded by the failure branch above
+        raise
+
+    except Exception as e:
+        # Handle integration request cleanup if created
+        if integration_request is not None:
+            update_integration_request_status(
+                integration_request.name,
+                status="Failed",
+                output=None,
+                error=str(e)
+            )
+        elif url:
+            insert_integration_request(
+                data=log_data,
+                url=url,
+                reference_doctype="Purchase Invoice",
+                reference_docname=doc.name,
+                status="Failed",
+                error=str(e),
+            )
+        on_error(
+            f"Invoice: {doc.name}, Supplier: {doc.supplier}, Error: {e}",
+            url="/TrnsPurchaseSaveReq",
+            doctype="Purchase Invoice",
+            document_name=doc.name,
+        )
+
+
 def build_purchase_invoice_payload(doc: Document) -> dict:
 	series_no = extract_document_series_number(doc)
 	items_list = get_items_details(doc)
 	taxation_type=get_taxation_types(doc)
+	tax_rates, tax_amounts, taxable_amounts = {}, {}, {}
+	for code in TAX_CODES:
+		tax_row = taxation_type.get(code) or EMPTY_TAX_ROW
+		tax_rates[f"taxRt{code}"] = tax_row.get("tax_rate", 0)
+		tax_amounts[f"taxAmt{code}"] = tax_row.get("tax_amount", 0)
+		taxable_amounts[f"taxblAmt{code}"] = tax_row.get("taxable_amount", 0)
+
+	# Owner and modifier are usually the same user, so only parse once
+	owner, modified_by = doc.owner, doc.modified_by
+	owner_id = owner.partition("@")[0] if owner else ""
+	modifier_id = owner_id if modified_by == owner else split_user_email(modified_by)
 
 	payload = {
 		"invcNo": series_no,
@@ -189,36 +304,24 @@ def build_purchase_invoice_payload(doc: Document) -> dict:
 		"pmtTyCd": doc.custom_payment_type_code,
 		"pchsSttsCd": doc.custom_purchase_status_code,
 		"cfmDt": None,
-		"pchsDt": "".join(str(doc.posting_date).split("-")),
+		"pchsDt": getdate(doc.posting_date).strftime("%Y%m%d"),
 		"wrhsDt": None,
 		"cnclReqDt": "",
 		"cnclDt": "",
 		"rfdDt": None,
 		"totItemCnt": len(items_list),
 		
-		"taxRtA": taxation_type.get("A", {}).get("tax_rate", 0),
-		"taxRtB": taxation_type.get("B", {}).get("tax_rate", 0),
-		"taxRtC": taxation_type.get("C", {}).get("tax_rate", 0),
-		"taxRtD": taxation_type.get("D", {}).get("tax_rate", 0),
-		"taxRtE": taxation_type.get("E", {}).get("tax_rate", 0),
-		"taxAmtA": taxation_type.get("A", {}).get("tax_amount", 0),
-		"taxAmtB": taxation_type.get("B", {}).get("tax_amount", 0),
-		"taxAmtC": taxation_type.get("C", {}).get("tax_amount", 0),
-		"taxAmtD": taxation_type.get("D", {}).get("tax_amount", 0),
-		"taxAmtE": taxation_type.get("E", {}).get("tax_amount", 0),
-		"taxblAmtA": taxation_type.get("A", {}).get("taxable_amount", 0),
-		"taxblAmtB": taxation_type.get("B", {}).get("taxable_amount", 0),
-		"taxblAmtC": taxation_type.get("C", {}).get("taxable_amount", 0),
-		"taxblAmtD": taxation_type.get("D", {}).get("taxable_amount", 0),
-		"taxblAmtE": taxation_type.get("E", {}).get("taxable_amount", 0),
+		**tax_rates,
+		**tax_amounts,
+		**taxable_amounts,
 		"totTaxblAmt": quantize_number(doc.base_net_total),
 		"totTaxAmt": quantize_number(doc.total_taxes_and_charges),
 		"totAmt": quantize_number(doc.grand_total),
 		"remark": None,
-		"regrNm": doc.owner,
-		"regrId": split_user_email(doc.owner),
-		"modrNm": doc.modified_by,
-		"modrId": split_user_email(doc.modified_by),
+		"regrNm": owner,
+		"regrId": owner_id,
+		"modrNm": modified_by,
+		"modrId": modifier_id,
 		"itemList": items_list,
 	}
 
@@ -226,9 +329,13 @@ def build_purchase_invoice_payload(doc: Document) -> dict:
 
 
 def get_items_details(doc: Document) -> list:
+	# Local alias avoids a global lookup for every quantized field of every row
+	quantize = quantize_number
 	items_list = []
 
-	for index, item in enumerate(doc.items):
+	for item in doc.items:
+		net_amount = item.net_amount
+		tax_amount = item.custom_tax_amount or 0
 
 		items_list.append(
 			{
@@ -246,12 +353,12 @@ def get_items_details(doc: Document) -> list:
 				"qty": abs(item.qty),
 				"prc": item.base_rate,
 				"splyAmt": item.base_amount,
-				"dcRt": quantize_number(item.discount_percentage) or 0,
-				"dcAmt": quantize_number(item.discount_amount) or 0,
-				"taxblAmt": quantize_number(item.net_amount),
+				"dcRt": quantize(item.discount_percentage) or 0,
+				"dcAmt": quantize(item.discount_amount) or 0,
+				"taxblAmt": quantize(net_amount),
 				"taxTyCd": item.custom_taxation_type or "B",
-				"taxAmt": quantize_number(item.custom_tax_amount) or 0,
-				"totAmt": quantize_number(item.net_amount + item.custom_tax_amount),
+				"taxAmt": quantize(tax_amount),
+				"totAmt": quantize(net_amount + tax_amount),
 				"itemExprDt": None,
 			}
 		)
@@ -259,18 +366,41 @@ def get_items_details(doc: Document) -> list:
 	return items_list
 
 def validate_item_registration(items):
-	for item in items:
-		item_code = item.item_code
-		validation_message(item_code)
-		
-def validation_message(item_code):
-	item_doc = frappe.get_doc("Item", item_code)
-	
-	if item_doc.custom_referenced_imported_item and (item_doc.custom_item_registered == 0 or item_doc.custom_imported_item_submitted == 0):
-		item_link = get_link_to_form("Item", item_doc.name)
-		frappe.throw(f"Register or submit the item: {item_link}")
-	
-	elif not item_doc.custom_referenced_imported_item and item_doc.custom_item_registered == 0:
-		item_link = get_link_to_form("Item", item_doc.name)
-		frappe.throw(f"Register the item: {item_link}")
+	validate_item_codes_registration([item.item_code for item in items])
+
+def validate_item_codes_registration(item_codes: list[str]) -> None:
+	"""Ensure every item is registered (and submitted, if imported) in eTIMS"""
+	# Fetch the registration flags of every distinct item in one query
+	item_codes = list(dict.fromkeys(item_codes))
+	if not item_codes:
+		return
+
+	registration_flags = {
+		item.name: item
+		for item in frappe.get_all(
+			"Item",
+			filters={"name": ["in", item_codes]},
+			fields=[
+				"name",
+				"custom_item_registered",
+				"custom_imported_item_submitted",
+				"custom_referenced_imported_item",
+			],
+		)
+	}
+
+	messages = []
+	for item_code in item_codes:
+		item = registration_flags.get(item_code)
+		if not item:
+			messages.append(f"Item {item_code} not found")
+			continue
+
+		if item.custom_referenced_imported_item and (item.custom_item_registered == 0 or item.custom_imported_item_submitted == 0):
+			messages.append(f"Register or submit the item: {get_link_to_form('Item', item.name)}")
+
+		elif not item.custom_referenced_imported_item and item.custom_item_registered == 0:
+			messages.append(f"Register the item: {get_link_to_form('Item', item.name)}")
 
+	if messages:
+		frappe.throw("<br>".join(messages))
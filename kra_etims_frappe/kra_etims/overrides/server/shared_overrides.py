@@ -1,10 +1,8 @@
 from collections import defaultdict
 from functools import partial
 from typing import Literal
-import json
 import frappe
 from frappe.model.document import Document
-from frappe.integrations.utils import create_request_log
 
 from ...utils import (
     build_invoice_payload,
@@ -17,6 +15,8 @@ from ...apis.remote_response_status_handlers import (
 
 from ...apis.apis import  (
     EtimsSDKWrapper,
+    dump_response,
+    insert_integration_request,
     update_integration_request_status
 )
 
@@ -27,22 +27,15 @@ def generic_invoices_on_submit_override(
     company_name = doc.company
     vendor = "OSCU KRA"
     branch_id = doc.branch or "00"
+    log_data = {"invoice_type": invoice_type, "invoice_no": doc.name}
     
     def _submit_sales_transaction():
+        url = None
+        integration_request = None
         try:
             # Get SDK client with branch-specific configuration
             client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-            
-            # Create integration request BEFORE API call for audit trail
-            integration_request = create_request_log(
-                data={"invoice_type": invoice_type, "invoice_no": doc.name},
-                is_remote_request=True,
-                service_name="eTIMS",
-                request_headers={},
-                url=f"SDK:{client.config['env']}:save_transaction_sales",
-                reference_docname=doc.name,
-                reference_doctype=invoice_type,
-            )
+            url = f"SDK:{client.config['env']}:save_transaction_sales"
             
             # Build payload using existing helper function
             invoice_identifier = "C" if doc.is_return else "S"
@@ -51,12 +44,16 @@ def generic_invoices_on_submit_override(
             # Submit to eTIMS via SDK
             response = client.save_sales_transaction(payload)
             
+            # Write the audit row once, with the outcome, instead of
+            # inserting it before the call and updating it after
             if response.get("resultCd") == "000":
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype=invoice_type,
+                    reference_docname=doc.name,
                     status="Completed",
-                    output=json.dumps(response),
-                    error=None
+                    output=dump_response(response),
                 )
                 
                 # Call success handler with all required context
@@ -75,11 +72,13 @@ def generic_invoices_on_submit_override(
                     indicator="green"
                 )
             else:
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype=invoice_type,
+                    reference_docname=doc.name,
                     status="Failed",
-                    output=None,
-                    error=response.get("resultMsg", "Unknown error")
+                    error=response.get("resultMsg", "Unknown error"),
                 )
                 on_error(
                     response.get("resultMsg", "Unknown error"),
@@ -98,13 +97,22 @@ def generic_invoices_on_submit_override(
                 
         except Exception as e:
             # Handle integration request cleanup if created
-            if 'integration_request' in locals():
+            if integration_request is not None:
                 update_integration_request_status(
                     integration_request.name,
                     status="Failed",
                     output=None,
                     error=str(e)
                 )
+            elif url:
+                insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype=invoice_type,
+                    reference_docname=doc.name,
+                    status="Failed",
+                    error=str(e),
+                )
             on_error(str(e), url="/TrnsSalesSaveWrReq", doctype=invoice_type, document_name=doc.name)
             frappe.log_error(
                 title=f"eTIMS {invoice_type} Submission Error",
@@ -1,12 +1,10 @@
 from functools import partial
 from hashlib import sha256
 from typing import Literal
-import json
 
 import frappe
 from frappe.model.document import Document
 from erpnext.controllers.taxes_and_totals import get_itemised_tax_breakup_data
-from frappe.integrations.utils import create_request_log
 
 from ...apis.remote_response_status_handlers import (
     on_error,
@@ -20,6 +18,8 @@ from ...utils import (
 
 from ...apis.apis import  (
     EtimsSDKWrapper,
+    dump_response,
+    insert_integration_request,
     update_integration_request_status
 )
 
@@ -40,23 +40,16 @@ def on_update(doc: Document, method: str | None = None) -> None:
 
     company_name = doc.company
     vendor = "OSCU KRA"
+    log_data = {"voucher_type": doc.voucher_type, "voucher_no": doc.voucher_no}
     
     def _submit_stock_movement():
+        url = None
+        integration_request = None
         try:
             # Get branch ID from warehouse (critical for multi-branch setups)
             branch_id = get_warehouse_branch_id(doc.warehouse) or "00"
             client = EtimsSDKWrapper.get_client(company_name, vendor, branch_id)
-            
-            # Create integration request BEFORE API call for audit trail
-            integration_request = create_request_log(
-                data={"voucher_type": doc.voucher_type, "voucher_no": doc.voucher_no},
-                is_remote_request=True,
-                service_name="eTIMS",
-                request_headers={},
-                url=f"SDK:{client.config['env']}:save_stock_movement",
-                reference_docname=doc.name,
-                reference_doctype="Stock Ledger Entry",
-            )
+            url = f"SDK:{client.config['env']}:save_stock_movement"
             
             # Build payload with preserved business logic
             payload = _build_stock_movement_payload(doc, company_name, vendor)
@@ -64,20 +57,25 @@ def on_update(doc: Document, method: str | None = None) -> None:
             # Submit to eTIMS via SDK
             response = client.save_stock_master(payload)
             
+            # Write the audit row once, with the outcome
             if response.get("resultCd") == "000":
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype="Stock Ledger Entry",
+                    reference_docname=doc.name,
                     status="Completed",
-                    output=json.dumps(response),
-                    error=None
+                    output=dump_response(response),
                 )
                 stock_mvt_submission_on_success(response, document_name=doc.name)                
             else:
-                update_integration_request_status(
-                    integration_request.name,
+                integration_request = insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype="Stock Ledger Entry",
+                    reference_docname=doc.name,
                     status="Failed",
-                    output=None,
-                    error=response.get("resultMsg", "Unknown error")
+                    error=response.get("resultMsg", "Unknown error"),
                 )
                 on_error(
                     response.get("resultMsg", "Unknown error"),
@@ -92,13 +90,22 @@ def on_update(doc: Document, method: str | None = None) -> None:
                 
         except Exception as e:
             # Handle integration request cleanup if created
-            if 'integration_request' in locals():
+            if integration_request is not None:
                 update_integration_request_status(
                     integration_request.name,
                     status="Failed",
                     output=None,
                     error=str(e)
                 )
+            elif url:
+                insert_integration_request(
+                    data=log_data,
+                    url=url,
+                    reference_doctype="Stock Ledger Entry",
+                    reference_docname=doc.name,
+                    status="Failed",
+                    error=str(e),
+                )
             on_error(str(e), url="/StockIOSaveReq", doctype="Stock Ledger Entry", document_name=doc.name)
             frappe.log_error(
                 title="eTIMS Stock Movement Error",
@@ -422,11 +429,11 @@ def get_notes_docs_items_details(
 
 
 def get_warehouse_branch_id(warehouse_name: str) -> str | Literal[0]:
-    branch_id = frappe.db.get_value(
-        "Warehouse", {"name": warehouse_name}, ["custom_branch"], as_dict=True
-    )
-
-    if branch_id:
-        return branch_id.custom_branch
-
-    return 0
+    if not warehouse_name:
+        return 0
+
+    # Served from the document cache, which Frappe clears when the Warehouse is saved
+    try:
+        return frappe.get_cached_value("Warehouse", warehouse_name, "custom_branch")
+    except frappe.DoesNotExistError:
+        return 0
@@ -0,0 +1,17 @@
+import frappe
+
+
+def add_submission_indexes() -> None:
+    """Index the custom eTIMS submission flags the scheduled scans filter on.
+
+    The columns come from the Custom Field fixtures, so this runs after they
+    are synced, on install and on every migrate; add_index skips an index
+    that already exists.
+    """
+    # Serves both scheduled scans: unsent entries (submitted = 0, docstatus = 1)
+    # and entries whose inventory is still to be sent (submitted = 1, inventory = 0)
+    frappe.db.add_index(
+        "Stock Ledger Entry",
+        ["custom_submitted_successfully", "custom_inventory_submitted_successfully", "docstatus"],
+        index_name="etims_submission_status_index",
+    )
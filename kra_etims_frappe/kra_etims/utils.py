@@ -1,9 +1,11 @@
 """Utility functions"""
 
 import re
+from collections import defaultdict
 from base64 import b64encode
 from datetime import datetime, timedelta
 from decimal import ROUND_DOWN, Decimal
+from functools import lru_cache
 from io import BytesIO
 from typing import Literal
 
@@ -11,6 +13,7 @@ import qrcode
 
 import frappe
 from frappe.model.document import Document
+from frappe.utils.caching import request_cache
 from erpnext.controllers.taxes_and_totals import get_itemised_tax_breakup_data
 
 
@@ -106,9 +109,9 @@ def get_environment_settings(
         communication_key,
         sales_control_unit_id as scu_id
     FROM `tab{doctype}`
-    WHERE company = '{company_name}'
-        AND env = '{environment}'
-        AND vendor = '{vendor}'
+    WHERE company = %(company_name)s
+        AND env = %(environment)s
+        AND vendor = %(vendor)s
         AND name IN (
             SELECT name
             FROM `tab{doctype}`
@@ -118,11 +121,19 @@ def get_environment_settings(
 
     # Append the branch_id condition to the query if provided
     if branch_id:
-    # Append the branch_id condition to the query
-     query += f" AND bhfid = '{branch_id}';"
+        query += " AND bhfid = %(branch_id)s"
     
-    # Execute the query
-    setting_doctype = frappe.db.sql(query, as_dict=True)
+    # Execute the query; the values are passed as parameters, not formatted in
+    setting_doctype = frappe.db.sql(
+        query,
+        {
+            "company_name": company_name,
+            "environment": environment,
+            "vendor": vendor,
+            "branch_id": branch_id,
+        },
+        as_dict=True,
+    )
 
     # Return the first result if found
     if setting_doctype:
@@ -497,14 +508,18 @@ def bytes_to_base64_string(data: bytes) -> str:
     return b64encode(data).decode("utf-8")
 
 
+TWO_PLACES = Decimal(".01")
+
+
 def quantize_number(number: str | int | float) -> str:
     """Return number value to two decimal points"""
-    return Decimal(number).quantize(Decimal(".01"), rounding=ROUND_DOWN).to_eng_string()
+    return Decimal(number).quantize(TWO_PLACES, rounding=ROUND_DOWN).to_eng_string()
 
 
+@lru_cache(maxsize=4096)
 def split_user_email(email_string: str) -> str:
     """Retrieve portion before @ from an email string"""
-    return email_string.split("@")[0]
+    return email_string.partition("@")[0]
 
 
 def calculate_tax(doc: "Document") -> None:
@@ -595,6 +610,7 @@ def get_taxation_types(doc):
 
     return taxation_totals
 
+@request_cache
 def get_first_branch_id() -> str | None:
     settings = frappe.get_all("eTims Settings", filters={"is_active": 1}, fields=["bhfid"], limit=1)
 
@@ -603,6 +619,38 @@ def get_first_branch_id() -> str | None:
 
     return None
 
+def get_docs_in_bulk(doctype: str, filters: dict) -> list[Document]:
+    """Load every matching document with one query per table instead of a get_doc per record"""
+    parents = frappe.get_all(doctype, filters=filters, fields=["*"])
+    if not parents:
+        return []
+
+    names = [parent.name for parent in parents]
+    table_fields = frappe.get_meta(doctype).get_table_fields()
+    children: dict[tuple[str, str], list] = defaultdict(list)
+
+    for table in table_fields:
+        for row in frappe.get_all(
+            table.options,
+            filters={
+                "parent": ["in", names],
+                "parenttype": doctype,
+                "parentfield": table.fieldname,
+            },
+            fields=["*"],
+            order_by="idx asc",
+        ):
+            children[(row.parent, table.fieldname)].append(row)
+
+    docs = []
+    for parent in parents:
+        for table in table_fields:
+            parent[table.fieldname] = children.get((parent.name, table.fieldname), [])
+
+        parent.doctype = doctype
+        docs.append(frappe.get_doc(parent))
+
+    return docs
 
 
 def insert_warehouse_type(warehouse_type):